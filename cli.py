@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Command line entry point for env-tui. Arguments are parsed before anything heavy is
+# imported: --get and --list only need the RC parser and the search engine, so Textual,
+# pyperclip and the UI modules (ui.py, env_tui.css) are loaded only when the TUI starts.
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Set
+
+# Local imports (all light: no Textual)
+import config
+import search_query # Same query syntax as the Search bar
+import startup_profile
+from search_engine import SearchEngine
+from shell_utils import get_user_defined_vars_from_rc
+
+FILTER_STATES = ["all", "user", "system"] # Same filters as the TUI
+PROFILE_FILE_NAME = "startup_profile.json" # Default --profile-startup output, in the config dir
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line options. Without a command, the interactive TUI is started."""
+    parser = argparse.ArgumentParser(
+        prog="env-tui",
+        description="View and filter environment variables. Starts the TUI unless a command is given.",
+    )
+    commands = parser.add_mutually_exclusive_group()
+    commands.add_argument(
+        "-g", "--get", metavar="NAME",
+        help="print the value of NAME and exit (exit status 1 if it is not set)",
+    )
+    commands.add_argument(
+        "-l", "--list", metavar="QUERY", nargs="?", const="",
+        help="print NAME=value for the variables matching QUERY (Search bar syntax, "
+             "e.g. 'name:AWS_ len>10' or 'component:/usr/bin') and exit",
+    )
+    parser.add_argument(
+        "-f", "--filter", choices=FILTER_STATES, default="all",
+        help="with --list: only user (RC file) or system variables",
+    )
+    parser.add_argument(
+        "--all-shells", action="store_true",
+        help="read the config files of bash, sh, zsh and fish (not just $SHELL's): the TUI "
+             "shows which shells export each variable and can update all of them at once",
+    )
+    parser.add_argument(
+        "--profile-startup", metavar="JSON", nargs="?", const="",
+        help="time the startup phases and imports of the TUI; print a breakdown on exit and "
+             f"write it as JSON to JSON (default: ~/.config/env_tui/{PROFILE_FILE_NAME})",
+    )
+    return parser
+
+
+def _matching_names(env_vars: Dict[str, str], user_var_names: Set[str], query: str, filter_state: str) -> List[str]:
+    """Sorted names matching query, as the Search bar's substring mode would show them."""
+    engine = SearchEngine()
+    engine.load(env_vars)
+    type_of = lambda name: "user" if name in user_var_names else "system"
+    component = search_query.parse_component_query(query)
+    if component is not None:
+        names, _ = engine.component_search(component)
+    elif search_query.is_structured_query(query):
+        names = engine.predicate_search(search_query.compile_query(query, type_of, filter_state))
+    else:
+        names = engine.search(query)
+    if filter_state == "all":
+        return names
+    return [name for name in names if type_of(name) == filter_state]
+
+
+def run_command(args: argparse.Namespace) -> int | None:
+    """Runs a non-interactive command. Returns its exit status, or None to start the TUI."""
+    if args.get is not None:
+        value = os.environ.get(args.get)
+        if value is None:
+            print(f"{args.get} is not set", file=sys.stderr)
+            return 1
+        print(value)
+        return 0
+    if args.list is not None:
+        env_vars = dict(os.environ.items())
+        user_var_names = get_user_defined_vars_from_rc(args.all_shells) # For --filter and type: terms
+        for name in _matching_names(env_vars, user_var_names, args.list, args.filter):
+            print(f"{name}={env_vars[name]}")
+        return 0
+    return None
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Entry point of the env-tui command."""
+    args = build_parser().parse_args(argv)
+    status = run_command(args)
+    if status is not None:
+        return status
+    if args.profile_startup is None:
+        # Interactive: only now pay for importing Textual and the UI
+        import env_tui
+        env_tui.main(all_shells=args.all_shells)
+        return 0
+
+    profiler = startup_profile.enable()
+    profiler.start_import_timing()
+    try:
+        with profiler.phase("module imports"):
+            import env_tui
+    finally:
+        profiler.stop_import_timing()
+    env_tui.main(all_shells=args.all_shells)
+    # The app has exited (terminal restored), so the report can go to the console
+    json_path = Path(args.profile_startup) if args.profile_startup else config.get_config_dir() / PROFILE_FILE_NAME
+    print(profiler.report(), file=sys.stderr)
+    try:
+        profiler.write_json(json_path)
+        print(f"Startup profile written to {json_path}", file=sys.stderr)
+    except OSError as e:
+        print(f"ERROR: Could not write startup profile to {json_path}: {e}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,21 @@
 import os
 import sys
 from pathlib import Path
+from typing import List
 
 # --- Constants for Config ---
 APP_NAME = "env_tui"
 CONFIG_DIR_NAME = ".config" # Standard on Linux/macOS, use AppData on Windows
 SETTINGS_FILE_NAME = "settings.txt" # File for theme name
+SEARCH_DEBOUNCE_ENV_VAR = "ENV_TUI_SEARCH_DEBOUNCE_MS" # Override for the search delay
+DEFAULT_SEARCH_DEBOUNCE_MS = 120 # Wait this long after the last keystroke before searching
+SEARCH_INDEX_ENV_VAR = "ENV_TUI_SEARCH_INDEX" # "on", "off" or "auto" (default)
+SEARCH_INDEX_AUTO_MIN_VARS = 2000 # In "auto" mode, build the trigram index from this many vars
+VIRTUAL_TABLE_ENV_VAR = "ENV_TUI_VIRTUAL_TABLE" # "on", "off" or "auto" (default)
+VIRTUAL_TABLE_AUTO_MIN_VARS = 5000 # In "auto" mode, only render visible rows from this many vars
+RC_WATCH_ENV_VAR = "ENV_TUI_RC_WATCH" # "auto" (inotify, else polling; default), "poll" or "off"
+RC_WATCH_MODES = ("auto", "poll", "off")
+RC_SHELLS_ENV_VAR = "ENV_TUI_RC_SHELLS" # Shells "Update All Shells" writes to, e.g. "bash,zsh,fish"
 
 def get_config_dir() -> Path:
     """Gets the application's configuration directory path (Linux/macOS)."""
@@ -20,6 +30,54 @@ def get_settings_file_path() -> Path:
     # print(f"DEBUG: Settings file path: {path}") # Optional Debug
     return path
 
+def load_search_debounce_ms() -> int:
+    """Gets the search debounce delay in milliseconds (from ENV_TUI_SEARCH_DEBOUNCE_MS, if valid)."""
+    raw_value = os.environ.get(SEARCH_DEBOUNCE_ENV_VAR, "").strip()
+    if raw_value:
+        try:
+            delay_ms = int(raw_value)
+            if delay_ms >= 0:
+                return delay_ms
+            print(f"Warning: {SEARCH_DEBOUNCE_ENV_VAR} must not be negative. Using default.")
+        except ValueError:
+            print(f"Warning: Invalid {SEARCH_DEBOUNCE_ENV_VAR} value '{raw_value}'. Using default.")
+    return DEFAULT_SEARCH_DEBOUNCE_MS
+
+def _load_auto_setting(env_var: str, var_count: int, auto_min_vars: int) -> bool:
+    """Reads an on/off/auto switch from env_var; 'auto' enables it from auto_min_vars variables."""
+    mode = os.environ.get(env_var, "auto").strip().lower()
+    if mode in ("on", "1", "true", "yes"):
+        return True
+    if mode in ("off", "0", "false", "no"):
+        return False
+    if mode != "auto":
+        print(f"Warning: Invalid {env_var} value '{mode}'. Using 'auto'.")
+    return var_count >= auto_min_vars
+
+def load_search_index_setting(var_count: int) -> bool:
+    """Decides whether to use the trigram search index (ENV_TUI_SEARCH_INDEX, default 'auto')."""
+    return _load_auto_setting(SEARCH_INDEX_ENV_VAR, var_count, SEARCH_INDEX_AUTO_MIN_VARS)
+
+def load_virtual_table_setting(var_count: int) -> bool:
+    """Decides whether to use the virtualized variable table (ENV_TUI_VIRTUAL_TABLE, default 'auto')."""
+    return _load_auto_setting(VIRTUAL_TABLE_ENV_VAR, var_count, VIRTUAL_TABLE_AUTO_MIN_VARS)
+
+def load_rc_watch_setting() -> str:
+    """How to watch the RC files for changes made while the app runs (ENV_TUI_RC_WATCH)."""
+    raw_value = os.environ.get(RC_WATCH_ENV_VAR, "").strip().lower()
+    if raw_value in RC_WATCH_MODES:
+        return raw_value
+    if raw_value:
+        print(f"Warning: Invalid {RC_WATCH_ENV_VAR} value '{raw_value}'. Using 'auto'.")
+    return "auto"
+
+def load_rc_shells_setting() -> List[str] | None:
+    """Shells written by "Update All Shells" (ENV_TUI_RC_SHELLS), or None for every shell with a config file."""
+    raw_value = os.environ.get(RC_SHELLS_ENV_VAR, "").strip()
+    if not raw_value:
+        return None
+    return [shell.strip().lower() for shell in raw_value.split(",") if shell.strip()]
+
 def load_theme_setting() -> str | None:
     """Loads the theme name setting from the config file. Returns None if not found or error."""
     print("DEBUG: load_theme_setting() called")
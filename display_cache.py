@@ -0,0 +1,87 @@
+from typing import Dict, Optional, Tuple
+
+from rich.cells import get_character_cell_size
+from rich.text import Text
+
+ELLIPSIS = "..."
+MIN_VALUE_WIDTH = 20 # Never squeeze the Value column below this many cells
+HIGHLIGHT_STYLE = "bold black on yellow" # Search match highlighting
+MATCH_CONTEXT_FRACTION = 3 # Windowed cells show ~1/3 of the width before the match
+
+Span = Tuple[int, int]
+
+
+def truncate_to_width(value: str, width: int) -> str:
+    """
+    Truncates value to at most width terminal cells, ending in '...' when cut.
+    Wide (e.g. CJK) and zero-width (combining) characters are measured properly.
+    Only the characters that can end up in the cell are looked at, so a huge value
+    is never copied or scanned in full.
+    """
+    limit = max(width - len(ELLIPSIS), 0) # Room left for text when the value has to be cut
+    cut_index = None # Where to cut if the value turns out not to fit
+    total = 0
+    for index, char in enumerate(value):
+        total += get_character_cell_size(char)
+        if cut_index is None and total > limit:
+            cut_index = index
+        if total > width:
+            return value[:cut_index] + ELLIPSIS
+    return value # Fits entirely
+
+
+def highlight(text: str, span: Optional[Span]) -> Text | str:
+    """text with span highlighted (plain text is returned when there is nothing to highlight)."""
+    if span is None or span[0] >= span[1]:
+        return text
+    rendered = Text(text)
+    rendered.stylize(HIGHLIGHT_STYLE, span[0], min(span[1], len(text)))
+    return rendered
+
+
+def render_value_cell(value: str, width: int, span: Optional[Span] = None) -> Text | str:
+    """
+    The Value cell: value truncated to width cells, with the match span highlighted.
+    If the match would fall outside the cell, the cell shows a window around it
+    ('...' + context + match + ...), slicing only that part of the value.
+    """
+    if span is None or span[0] >= span[1]:
+        return truncate_to_width(value, width)
+    start, end = span
+    offset = 0
+    if end > width - len(ELLIPSIS):
+        offset = max(0, start - width // MATCH_CONTEXT_FRACTION)
+    if offset:
+        # Bounded slice: no more characters than could possibly fit in the cell
+        cell = ELLIPSIS + truncate_to_width(value[offset:offset + 2 * width], width - len(ELLIPSIS))
+        shift = len(ELLIPSIS) - offset
+    else:
+        cell = truncate_to_width(value, width)
+        shift = 0
+    return highlight(cell, (start + shift, end + shift))
+
+
+class DisplayCache:
+    """
+    Remembers the rendered Value cell for each variable, keyed on the value it was
+    rendered from, the column width and the highlighted match span, so cells are
+    only recomputed after an edit, a resize or a change in where the search matched.
+    """
+
+    def __init__(self) -> None:
+        # name -> (value, width, span, cell)
+        self._cells: Dict[str, Tuple[str, int, Optional[Span], Text | str]] = {}
+
+    def get(self, name: str, value: str, width: int, span: Optional[Span] = None) -> Text | str:
+        """Returns the display cell for value at width, computing it only when needed."""
+        entry = self._cells.get(name)
+        if (entry is not None and entry[1] == width and entry[2] == span
+                and (entry[0] is value or entry[0] == value)):
+            return entry[3]
+        cell = render_value_cell(value, width, span)
+        self._cells[name] = (value, width, span, cell)
+        return cell
+
+    def discard(self, name: str) -> None:
+        """Forgets the cell for a deleted variable."""
+        self._cells.pop(name, None)
@@ -8,25 +8,33 @@ import sys # For platform detection
 import shutil # For finding executables (shutil.which)
 from pathlib import Path # Added for config path handling
 import tempfile # For creating temporary files
+import regex # regex.error for search patterns that do not compile
 
 # Local imports
 import config # Import the new config module
 import shell_utils # Import the new shell utils module
-from shell_utils import get_user_defined_vars_from_rc # Import the new function
+import rc_document # export/unset commands in the user's shell syntax
+import rc_transaction # Staged RC edits, committed together (staging mode)
 import ui # Import the new ui module
+from search_engine import ResultCache, SearchEngine # Incremental search over loaded variables
+import search_query # Field-scoped query syntax (name:, value:, type:, len>N)
+import startup_profile # Phase timings for --profile-startup (no-ops otherwise)
+from rc_watcher import RcWatcher # Follows RC file edits made while the app runs
+from display_cache import DisplayCache, HIGHLIGHT_STYLE, MIN_VALUE_WIDTH, highlight # Width-aware, cached Value cells
 
+from rich.text import Text
 from textual.app import App, ComposeResult
 # Container imports moved to ui.py
-from textual.containers import ScrollableContainer # Keep ScrollableContainer for left-pane access
 from textual.reactive import reactive
 # Specific widget imports (Header, Footer, Label) moved to ui.py
 from textual.widgets import DataTable, Input, Button, Static, TextArea # Add Static here, TextArea
 from textual.widgets._data_table import DuplicateKey
 from textual.binding import Binding # Import Binding
-from textual import events # Import events for on_key
+from textual import events, work # Import events for on_key, work for background search
+from textual.worker import get_current_worker
 # OptionList/Option imports likely not needed here anymore if not used directly
 # REMOVED: from textual._theme import THEMES as AVAILABLE_THEMES
-from typing import Dict, Tuple, Set # Added Set for type hint
+from typing import Callable, Dict, List, Tuple, Set # Added Set for type hint
 
 
 class EnvTuiApp(App):
@@ -45,6 +53,10 @@ class EnvTuiApp(App):
         Binding("e", "toggle_edit", "Edit Value"),
         Binding("a", "toggle_add", "Add Variable"),
         Binding("d", "request_delete", "Delete Variable"),
+        Binding("ctrl+t", "cycle_search_mode", "Search Mode"),
+        Binding("g", "jump_to_definition", "Go to Definition"),
+        Binding("s", "toggle_staging", "Stage RC Edits"),
+        Binding("p", "review_changes", "Pending Changes"),
         # Removed: Binding("right", "cycle_filter", "Cycle Filter", show=False),
         # F1 for theme switching is usually handled by Header
     ]
@@ -66,6 +78,10 @@ class EnvTuiApp(App):
     editing_var_name = reactive[str | None](None)
     deleting_var_name = reactive[str | None](None) # Added for delete confirmation
     deleting_var_source = reactive[str | None](None) # Added to store source during delete
+    # Staging mode: Update RC stages edits (see rc_transaction) until they are committed
+    staging_mode = reactive(False, init=False) # No "off" notification at startup
+    # State for the pending-changes review pane
+    review_mode = reactive(False, layout=True)
 
     # Reactive variable to store the content for the right pane
     selected_var_details = reactive(("", ""), layout=True)
@@ -73,53 +89,99 @@ class EnvTuiApp(App):
     selected_var_source = reactive[str | None](None, layout=True)
 
     search_term = reactive("", layout=True)
+    # --- Search Mode ---
+    SEARCH_MODES = ["substring", "fuzzy", "regex"]
+    search_mode = reactive("substring") # "substring", "fuzzy" or "regex"
+    FUZZY_RESULT_LIMIT = 200 # Fuzzy mode only materializes the best N matches
+    PENDING_TYPE = "..." # Type column until the RC file has been read in the background
     # Split environment variables
     user_env_vars: Dict[str, str] = reactive({}) # Vars likely defined by user in RC
     system_env_vars: Dict[str, str] = reactive({}) # Other vars (system/inherited)
     # Keep a combined view for easy lookup in some cases (like copy value)
     _all_env_vars_combined: Dict[str, str] = {}
     _is_updating_table = False # Flag to prevent concurrent updates
+    _search_timer = None # Pending debounce timer for the search input
+    _search_generation = 0 # Bumped on every search change; results from older searches are dropped
+    _search_status = "" # Extra info from the last search for the status label (e.g. regex scan stats)
+    _search_spans: Dict[str, Tuple] = {} # name -> (name span, value span) of the last search's matches
+    _store_version = 0 # Bumped on every add/edit/delete; part of the result cache key
+    _classified = False # True once the user/system split from the RC file is known
+    # Multi-shell view buttons -> the Update RC button they stand for
+    ALL_SHELLS_BUTTONS = {
+        "edit-save-all-rc": "edit-save-rc",
+        "add-save-all-rc": "add-save-rc",
+        "delete-confirm-all-rc": "delete-confirm-rc",
+    }
+    RC_WATCH_WAKE_SECONDS = 0.5 # The RC watcher checks for cancellation (app exit) this often
 
     # --- Configuration File Helpers ---
     # Moved to config.py
 
     # --- App Lifecycle ---
 
-    def __init__(self):
-        """Initialize the app and load theme preference."""
+    def __init__(self, all_shells: bool = False):
+        """
+        Initialize the app and load theme preference. all_shells reads the config files
+        of every supported shell (not just $SHELL's) and shows which shells export each variable.
+        """
         print("DEBUG: EnvTuiApp.__init__() started")
         # Call super first
         super().__init__()
+        self._all_shells = all_shells
+        self._shell_presence: Dict[str, str] = {} # name -> Shells cell, e.g. "bash zsh" (multi-shell view)
+        self._provenance: Dict[str, List[shell_utils.Definition]] = {} # name -> where the RC files define it
 
         # Load theme name from config file and set self.theme
-        loaded_theme = config.load_theme_setting()
+        with startup_profile.phase("config.load_theme_setting"):
+            loaded_theme = config.load_theme_setting()
         if loaded_theme:
             self.theme = loaded_theme
 
-        # --- Populate User and System Vars ---
-        print("DEBUG: Populating user and system env vars...")
-        user_var_names = get_user_defined_vars_from_rc()
-        print(f"DEBUG: Found {len(user_var_names)} vars in RC file: {user_var_names}")
+        # --- Populate Vars ---
+        # The table is filled straight from os.environ; which variables are user-defined is
+        # only known once the RC file has been read, which happens in a worker after mount
+        # (see _classify_variables), so a slow or huge RC file does not delay the first paint.
+        print("DEBUG: Populating env vars...")
         all_os_vars = dict(os.environ.items())
         self._all_env_vars_combined = all_os_vars # Store the combined view
+        self.user_env_vars = {}
+        self.system_env_vars = {}
+        # Lowercase every entry once up front; searches only narrow cached result sets
+        with startup_profile.phase("search engine load"):
+            self._search_engine = SearchEngine(
+                use_index=config.load_search_index_setting(len(self._all_env_vars_combined))
+            )
+            self._search_engine.load(self._all_env_vars_combined)
+        # --- End Populate ---
 
-        user_vars_dict = {}
-        system_vars_dict = {}
+        # Visible names per (filter, mode, query, store version), so flipping filters is instant
+        self._result_cache = ResultCache()
 
-        for name, value in all_os_vars.items():
-            if name in user_var_names:
-                user_vars_dict[name] = value
-            else:
-                system_vars_dict[name] = value
+        # Delay between the last keystroke and running the (threaded) search
+        self._search_debounce_ms = config.load_search_debounce_ms()
 
-        # Sort and assign to reactive attributes
-        self.user_env_vars = dict(sorted(user_vars_dict.items()))
-        self.system_env_vars = dict(sorted(system_vars_dict.items()))
-        print(f"DEBUG: Populated {len(self.user_env_vars)} user vars and {len(self.system_env_vars)} system vars.")
-        # --- End Populate ---
+        # Large environments use a table that only builds the rows in view
+        self._virtual_table = config.load_virtual_table_setting(len(self._all_env_vars_combined))
+
+        # Whether (and how) to follow edits to the RC files made while the app runs
+        self.rc_watch_mode = config.load_rc_watch_setting()
+
+        # Rendered Value cells, recomputed only when a value or the column width changes
+        self._display_cache = DisplayCache()
+        self._value_width = 73 # Cells; updated to the real column width once laid out
+
+        # Rows currently shown in the table, so updates only apply the difference
+        self._visible_order: List[str] = [] # Names in table row order
+        self._rendered_rows: Dict[str, Tuple] = {} # name -> (value, type, match spans, extra cells) as rendered
 
         # Dictionary to store changes (add/edit/delete) intended for the parent shell
         self.session_changes: Dict[str, str | None] = {}
+        # RC edits staged in staging mode, and whether quitting was already warned about them
+        self._pending_rc = rc_transaction.RcTransaction()
+        self._quit_warned = False
+        # State of each staged variable before its first staged change, restored on discard:
+        # name -> (user value, shown value, had a session change, session change); None: absent
+        self._staged_originals: Dict[str, Tuple[str | None, str | None, bool, str | None]] = {}
 
         print(f"DEBUG: EnvTuiApp.__init__() finished. Initial theme is '{self.theme}'")
 
@@ -127,21 +189,194 @@ class EnvTuiApp(App):
         """Called when the app is mounted."""
         print("DEBUG: on_mount() called")
         # Configure Combined Table
-        table = self.query_one("#combined-env-table", DataTable)
-        table.cursor_type = "row"
-        table.zebra_stripes = True
-        # Add columns including the new "Type" column
-        table.add_columns("Name", "Value", "Type")
-        table.fixed_columns = 1 # Keep Name column fixed if desired
+        with startup_profile.phase("on_mount table setup"):
+            table = self._get_table()
+            table.cursor_type = "row"
+            table.zebra_stripes = True
+            # Add columns including the new "Type" column (keys are kept for in-place cell updates)
+            # The multi-shell view adds a Shells column: which shells' config files export the variable
+            self._column_keys = table.add_columns("Name", "Value", "Type", *(["Shells"] if self._all_shells else []))
+            table.fixed_columns = 1 # Keep Name column fixed if desired
 
         # Defer the initial table population
         self.call_later(self.update_table)
+        # Read the RC file and split user/system variables off the UI thread
+        self._classify_variables()
+        # Size the Value column to the real pane width once the layout is known
+        self.call_after_refresh(self._refresh_value_width)
         print("DEBUG: on_mount() finished, update_table scheduled")
 
+    @work(thread=True, exclusive=True, group="classify")
+    def _classify_variables(self) -> None:
+        """Parses the RC file in the background, then applies the user/system split."""
+        with startup_profile.phase("get_user_defined_vars_from_rc"):
+            rc_files, user_var_names, shell_presence = self._collect_rc_files()
+            provenance = self._build_provenance(rc_files)
+        print(f"DEBUG: Found {len(user_var_names)} vars in RC file: {user_var_names}")
+        self.call_from_thread(self._apply_classification, user_var_names, shell_presence, provenance)
+        if self.rc_watch_mode != "off":
+            self.call_from_thread(self._watch_rc_files, rc_files)
+
+    def _collect_rc_files(
+        self, reuse: Dict[str, Dict[str, List[str]]] | None = None
+    ) -> Tuple[Dict[str, Dict[str, List[str]]], Set[str], Dict[str, str]]:
+        """
+        Reads the $SHELL config file, or in the multi-shell view every shell's config
+        files (concurrently), with their includes. Returns (path -> parse result, names
+        of the user-defined variables, name -> Shells cell). See collect_rc_files for reuse.
+        """
+        if not self._all_shells:
+            results = {os.path.abspath(path): result for path, result in shell_utils.collect_rc_files(None, reuse)}
+            return results, set().union(*(result["vars"] for result in results.values())), {}
+        results = {}
+        shells_of: Dict[str, Set[str]] = {}
+        for shell, rc_files in shell_utils.collect_shell_rc_files(reuse).items():
+            for path, result in rc_files:
+                results[os.path.abspath(path)] = result
+                for name in result["vars"]:
+                    shells_of.setdefault(name, set()).add(shell)
+        shell_presence = {
+            name: " ".join(shell for shell in shell_utils.SHELL_RC_FILES if shell in shells)
+            for name, shells in shells_of.items()
+        }
+        return results, set(shells_of), shell_presence
+
+    def _build_provenance(self, rc_files: Dict[str, Dict[str, List[str]]]) -> Dict[str, List[shell_utils.Definition]]:
+        """Where each user variable is defined, from the parse results (no file is read again)."""
+        if self._all_shells:
+            roots = shell_utils.get_all_shell_config_files()
+        else:
+            root = shell_utils.get_shell_config_file()
+            roots = [("", root)] if root else []
+        return shell_utils.build_provenance_index(roots, rc_files)
+
+    def _rc_watch_roots(self) -> List[str]:
+        """Config files to watch even while they do not exist (so creating one is noticed)."""
+        if self._all_shells:
+            return [path for _, path in shell_utils.get_shell_rc_candidates()]
+        root = shell_utils.get_shell_config_file()
+        return [os.path.abspath(root)] if root else []
+
+    @work(thread=True, exclusive=True, group="rc-watch")
+    def _watch_rc_files(self, rc_files: Dict[str, Dict[str, List[str]]]) -> None:
+        """
+        Watches the RC file and the files it sources while the app runs. When one
+        changes, only the changed files are parsed again (the rest reuse their last
+        result) and the variables whose user/system classification flipped are moved.
+        """
+        worker = get_current_worker()
+        results = rc_files
+        watched = lambda: self._rc_watch_roots() + list(results)
+        watcher = RcWatcher(watched(), self.rc_watch_mode)
+        print(f"DEBUG: Watching {len(results)} RC file(s) using {watcher.backend}")
+        try:
+            while not worker.is_cancelled:
+                changed = watcher.wait(self.RC_WATCH_WAKE_SECONDS)
+                if not changed or worker.is_cancelled:
+                    continue
+                print(f"DEBUG: RC files changed: {sorted(changed)}")
+                reuse = {path: result for path, result in results.items() if path not in changed}
+                results, user_var_names, shell_presence = self._collect_rc_files(reuse)
+                provenance = self._build_provenance(results)
+                watcher.watch(watched()) # Includes may have been added or removed
+                self.call_from_thread(
+                    self._apply_rc_change, user_var_names, shell_presence, provenance, sorted(changed)
+                )
+        finally:
+            watcher.close()
+
+    def _apply_rc_change(
+        self,
+        user_var_names: Set[str],
+        shell_presence: Dict[str, str],
+        provenance: Dict[str, List[shell_utils.Definition]],
+        changed_paths: List[str],
+    ) -> None:
+        """
+        Applies a new user/system split after an RC file changed on disk: only the
+        variables whose classification flipped move, and the table updates just the
+        affected Type cells (or rows, when filtering by type) and Shells cells.
+        Variables with staged RC changes keep their type: the file does not reflect
+        those changes until they are committed.
+        """
+        self._set_provenance(provenance)
+        staged = self._staged_originals
+        to_user = [name for name in self.system_env_vars if name in user_var_names and name not in staged]
+        to_system = [name for name in self.user_env_vars if name not in user_var_names and name not in staged]
+        presence_changed = shell_presence != self._shell_presence
+        self._shell_presence = shell_presence
+        if not to_user and not to_system:
+            if presence_changed:
+                self._refresh_table() # Only Shells cells differ
+            return
+        for name in to_user:
+            self.user_env_vars[name] = self.system_env_vars.pop(name)
+        for name in to_system:
+            self.system_env_vars[name] = self.user_env_vars.pop(name)
+        print(f"DEBUG: Reclassified {len(to_user)} var(s) as user and {len(to_system)} as system")
+        self._store_version += 1 # Cached results for the user/system filters are stale
+        self._update_filter_status_label()
+        self._refresh_table()
+        var_name = self.selected_var_details[0]
+        if var_name in to_user or var_name in to_system:
+            self.selected_var_source = "User" if var_name in self.user_env_vars else "System"
+        changed_files = ", ".join(os.path.basename(path) for path in changed_paths)
+        self.notify(
+            f"{changed_files} changed: {len(to_user)} variable(s) now User, {len(to_system)} now System.",
+            title="RC File Changed",
+        )
+
+    def _apply_classification(
+        self,
+        user_var_names: Set[str],
+        shell_presence: Dict[str, str],
+        provenance: Dict[str, List[shell_utils.Definition]],
+    ) -> None:
+        """Splits the variables into user/system and updates the Type column and filters."""
+        self._shell_presence = shell_presence
+        self._set_provenance(provenance)
+        with startup_profile.phase("environment classification"):
+            user_vars_dict = {}
+            system_vars_dict = {}
+            for name, value in self._all_env_vars_combined.items():
+                if name in user_var_names:
+                    user_vars_dict[name] = value
+                else:
+                    system_vars_dict[name] = value
+            # Assign to reactive attributes (display order comes from the search engine's sorted key index)
+            self.user_env_vars = user_vars_dict
+            self.system_env_vars = system_vars_dict
+            self._classified = True
+        print(f"DEBUG: Populated {len(self.user_env_vars)} user vars and {len(self.system_env_vars)} system vars.")
+        self._store_version += 1 # Cached results were computed without the split
+        self._update_filter_status_label()
+        self._refresh_table() # Only the Type cells change
+        # The details pane took its source from the (pending) Type cell
+        var_name = self.selected_var_details[0]
+        if var_name:
+            self.selected_var_source = "User" if var_name in self.user_env_vars else "System"
+
+    def _set_provenance(self, provenance: Dict[str, List[shell_utils.Definition]]) -> None:
+        """Replaces the provenance index and refreshes the details pane if its variable moved."""
+        old_provenance = self._provenance
+        self._provenance = provenance
+        var_name = self.selected_var_details[0]
+        if var_name and old_provenance.get(var_name) != provenance.get(var_name):
+            self._update_detail_provenance(var_name)
+
+    def _require_classified(self) -> bool:
+        """Add/edit/delete need the user/system split; tell the user if it is still loading."""
+        if not self._classified:
+            self.notify("Still reading your shell config file, try again in a moment.", severity="warning")
+        return self._classified
+
     def on_unmount(self) -> None:
         """Called when the app is about to unmount (before exit)."""
         print("DEBUG: on_unmount() called")
+        self.workers.cancel_group(self, "rc-watch") # Lets the watcher thread finish promptly
         config.save_theme_setting(self.theme) # Save the current theme name using config module
+        if self._pending_rc:
+            self._restore_staged_originals() # Quitting discards them; do not export them to the shell
 
         # --- Write session changes to temporary file ---
         export_file_path = Path(tempfile.gettempdir()) / "env_tui_exports.sh"
@@ -180,13 +415,18 @@ class EnvTuiApp(App):
     def compose(self) -> ComposeResult:
         """Create child widgets by calling the function in the ui module."""
         # Delegate the actual composition to the ui module
-        yield from ui.compose_app()
+        yield from ui.compose_app(virtual_table=self._virtual_table, all_shells=self._all_shells)
 
     # --- update_table and other methods remain largely the same ---
     # (Ensure no other code relies on the old self.dark saving logic)
 
-    def update_table(self) -> None:
-        """Update the combined DataTable with filtered environment variables."""
+    @startup_profile.timed_phase("first update_table", marks_ready=True) # Only the first call is timed
+    def update_table(self, matching_names: List[str] | None = None, cache_key: Tuple | None = None) -> None:
+        """
+        Update the combined DataTable with filtered environment variables.
+        matching_names may be passed in when the search already ran in a worker;
+        the visible names are then cached under cache_key.
+        """
         if self._is_updating_table:
             # print("DEBUG: update_table() called while already updating. Skipping.") # Optional debug
             # If an update is already running, skip this one.
@@ -196,80 +436,49 @@ class EnvTuiApp(App):
         self._is_updating_table = True
         # print(f"DEBUG: update_table() started with filter: {self.filter_state}") # Debug
         try:
-            table = self.query_one("#combined-env-table", DataTable)
-            left_pane = self.query_one("#left-pane", ScrollableContainer)
-
-            # Store cursor/scroll state
-            current_cursor_row = table.cursor_row
-            current_scroll_y = left_pane.scroll_y
-            # Store the key of the currently selected row to try and restore selection
-            selected_key = None
-            # Check if cursor row is valid before trying to get the key
-            if 0 <= current_cursor_row < table.row_count:
-                try:
-                    selected_key = table.get_row_at(current_cursor_row)[0]
-                except IndexError: # Catch potential errors if row_count is inconsistent
-                    selected_key = None
-
-            table.clear(columns=False)
-
-            search = self.search_term.lower()
-            added_rows_keys = []
-            # No longer need added_keys_this_update with the combined approach for 'all'
-
-            # Populate based on filter state
-            if self.filter_state == "user":
-                for name, value in self.user_env_vars.items():
-                    if not search or search in name.lower() or search in value.lower():
-                        display_value = (value[:70] + '...') if len(value) > 73 else value
-                        table.add_row(name, display_value, "User", key=name)
-                        added_rows_keys.append(name)
-            elif self.filter_state == "system":
-                for name, value in self.system_env_vars.items():
-                    # Ensure we don't show system vars that are overridden by user vars
-                    # (This check might be redundant if _all_env_vars_combined is kept up-to-date,
-                    # but better safe than sorry, though system_env_vars *shouldn't* contain user vars)
-                    if name not in self.user_env_vars:
-                         if not search or search in name.lower() or search in value.lower():
-                            display_value = (value[:70] + '...') if len(value) > 73 else value
-                            table.add_row(name, display_value, "System", key=name)
-                            added_rows_keys.append(name)
-            elif self.filter_state == "all":
-                # Combine system and user vars (user takes precedence), then sort
-                combined_vars = {**self.system_env_vars, **self.user_env_vars}
-                sorted_combined = sorted(combined_vars.items())
-
-                for name, value in sorted_combined:
-                    if not search or search in name.lower() or search in value.lower():
-                        display_value = (value[:70] + '...') if len(value) > 73 else value
-                        # Determine type based on presence in the original user_env_vars dict
-                        var_type = "User" if name in self.user_env_vars else "System"
-                        table.add_row(name, display_value, var_type, key=name)
-                        added_rows_keys.append(name)
-
-            # --- Restore Cursor/Scroll ---
-            target_row_index = -1
-            if selected_key in added_rows_keys:
-                try:
-                    # Find the new index of the previously selected key
-                    target_row_index = table.get_row_index(selected_key)
-                except KeyError:
-                    target_row_index = -1 # Key not found (shouldn't happen if in added_rows_keys)
-
-            if target_row_index != -1:
-                 # Restore cursor to the previously selected row
-                 table.move_cursor(row=target_row_index, animate=False)
-            elif added_rows_keys:
-                 # If previous selection is gone, try to restore to roughly the same position,
-                 # ensuring the target index is valid for the *new* table size.
-                 if added_rows_keys: # Only attempt if there are rows
-                     target_row_index = min(current_cursor_row, len(added_rows_keys) - 1)
-                     if target_row_index >= 0:
-                         table.move_cursor(row=target_row_index, animate=False)
-
-            # Restore scroll position after rows are added
-            self.call_later(left_pane.scroll_to, y=current_scroll_y, animate=False)
-            # --- End Restore ---
+            table = self._get_table()
+
+            # Names matching the search term (sorted, or ranked in fuzzy mode)
+            if matching_names is None:
+                cache_key = self._search_cache_key(self.search_term, self.search_mode, self.filter_state)
+                cached = self._result_cache.get(cache_key)
+                if cached is not None:
+                    matching_names, self._search_status, self._search_spans = cached
+                else:
+                    matching_names, self._search_status, self._search_spans = self._compute_matches(
+                        self.search_term, self.search_mode, self.filter_state
+                    )
+                self._update_filter_status_label()
+
+            # Collect (name, value, type[, shells]) rows based on filter state, only walking the matching names
+            rows = []
+            shells_cell = self._shells_cell
+            if not self._classified:
+                # User/system split not known yet: show everything with a pending Type
+                if self.filter_state == "all":
+                    combined = self._all_env_vars_combined
+                    rows = [(name, combined[name], self.PENDING_TYPE) + shells_cell(name) for name in matching_names]
+                matching_names = ()
+            for name in matching_names:
+                if name in self.user_env_vars:
+                    if self.filter_state == "system":
+                        continue
+                    rows.append((name, self.user_env_vars[name], "User") + shells_cell(name))
+                elif name in self.system_env_vars:
+                    if self.filter_state == "user":
+                        continue
+                    rows.append((name, self.system_env_vars[name], "System") + shells_cell(name))
+                # else: Not part of the current user/system split
+
+            if cache_key is not None:
+                self._result_cache.put(
+                    cache_key, ([row[0] for row in rows], self._search_status, self._search_spans)
+                )
+
+            if self._virtual_table:
+                table.set_rows(rows, self._display_value, self._display_name) # Cells are built only for rows in view
+            else:
+                self._reconcile_table(table, rows)
 
         except DuplicateKey as e:
             # This might happen if a var exists in both user and system somehow? Should be handled by init logic.
@@ -283,23 +492,298 @@ class EnvTuiApp(App):
             self._is_updating_table = False # Ensure flag is reset
 
 
+    def _shells_cell(self, name: str) -> Tuple[str, ...]:
+        """The Shells cell of a row in the multi-shell view (no cell otherwise)."""
+        if not self._all_shells:
+            return ()
+        if not self._classified:
+            return (self.PENDING_TYPE,)
+        return (self._shell_presence.get(name, ""),)
+
+    def _get_table(self) -> DataTable:
+        """Returns the variable table (a DataTable, or a VirtualEnvTable with the same API subset)."""
+        return self.query_one("#combined-env-table")
+
+    def _reconcile_table(self, table: DataTable, rows: List[Tuple[str, str, str]]) -> None:
+        """
+        Brings the table in line with rows (name, value, type) by removing and adding only
+        the rows that changed; rows of unchanged variables are kept as they are, and the
+        cursor stays on the same variable. Falls back to a full rebuild when most rows
+        would be removed anyway (each DataTable.remove_row re-indexes the rows below it).
+        """
+        rendered = self._rendered_rows
+        new_order = [row[0] for row in rows]
+        new_names = set(new_order)
+        previous_order = self._visible_order
+        removed = [name for name in previous_order if name not in new_names]
+
+        # Remember which variable the cursor is on (_visible_order mirrors the table's row order)
+        cursor_row = table.cursor_row
+        selected_key = previous_order[cursor_row] if 0 <= cursor_row < len(previous_order) else None
+
+        if removed and len(removed) > len(previous_order) - len(removed):
+            table.clear(columns=False)
+            rendered.clear()
+            kept_order = []
+        else:
+            for name in removed:
+                table.remove_row(name)
+                del rendered[name]
+            kept_order = [name for name in previous_order if name in new_names] if removed else previous_order
+
+        name_column, value_column, type_column = self._column_keys[:3]
+        extra_columns = self._column_keys[3:] # Shells (multi-shell view only)
+        search_spans = self._search_spans
+        added = []
+        for name, value, var_type, *extra in rows:
+            spans = search_spans.get(name)
+            cached = rendered.get(name)
+            if cached is None:
+                table.add_row(
+                    self._display_name(name), self._display_value(name, value), var_type, *extra, key=name
+                )
+                added.append(name)
+            else:
+                # Only touch cells whose content changed (e.g. after an edit, or a new match position)
+                old_spans, new_spans = cached[2] or (None, None), spans or (None, None)
+                if old_spans[0] != new_spans[0]:
+                    table.update_cell(name, name_column, self._display_name(name))
+                if old_spans[1] != new_spans[1] or (cached[0] is not value and cached[0] != value):
+                    table.update_cell(name, value_column, self._display_value(name, value))
+                if cached[1] != var_type:
+                    table.update_cell(name, type_column, var_type)
+                if cached[3] != extra:
+                    for column, old_cell, cell in zip(extra_columns, cached[3], extra):
+                        if old_cell != cell:
+                            table.update_cell(name, column, cell)
+            rendered[name] = (value, var_type, spans, extra)
+
+        # New rows are appended at the end; re-order only if that differs from the wanted order
+        if kept_order + added != new_order:
+            position = {name: index for index, name in enumerate(new_order)}
+            table.sort(self._column_keys[0], key=lambda name: position[str(name)])
+        self._visible_order = new_order
+
+        # Keep the cursor on the same variable, or near its old position if it disappeared
+        if selected_key in new_names:
+            target_row_index = new_order.index(selected_key)
+        else:
+            target_row_index = min(cursor_row, len(new_order) - 1)
+        if target_row_index >= 0 and target_row_index != table.cursor_row:
+            table.move_cursor(row=target_row_index, animate=False)
+
+    def _display_name(self, name: str) -> Text | str:
+        """Name cell for the table, with the search match highlighted."""
+        spans = self._search_spans.get(name)
+        return highlight(name, spans[0] if spans else None)
+
+    def _display_value(self, name: str, value: str, width: int | None = None) -> Text | str:
+        """
+        Value cell for the table, truncated to the Value column's display width, with the
+        search match highlighted (cached). The match position comes from the filter pass.
+        """
+        spans = self._search_spans.get(name)
+        return self._display_cache.get(name, value, width or self._value_width, spans[1] if spans else None)
+
+    def _refresh_value_width(self) -> None:
+        """Recompute the Value column width from the pane size; re-render cells if it changed."""
+        if self._virtual_table:
+            return # The virtual table sizes its own columns and re-renders on resize
+        try:
+            table = self._get_table()
+            left_pane = self.query_one("#left-pane")
+            value_key = self._column_keys[1]
+            used = (
+                sum(table.columns[key].get_render_width(table) for key in self._column_keys if key != value_key)
+                + 2 * table.cell_padding # Value column's own padding
+            )
+            width = max(MIN_VALUE_WIDTH, left_pane.scrollable_content_region.width - used)
+        except Exception as e:
+            print(f"ERROR: Could not measure Value column width: {e}")
+            return
+        if width == self._value_width:
+            return
+        self._value_width = width
+        for name, (value, *_) in self._rendered_rows.items():
+            table.update_cell(name, value_key, self._display_value(name, value), update_width=True)
+
+    def on_resize(self, event: events.Resize) -> None:
+        """Terminal resized: re-fit the Value column once the new layout is applied."""
+        self.call_after_refresh(self._refresh_value_width)
+
+
     # --- Watchers ---
+    def _compute_matches(
+        self,
+        query: str,
+        mode: str,
+        filter_state: str,
+        is_cancelled: Callable[[], bool] | None = None,
+    ) -> Tuple[List[str], str, Dict[str, Tuple]] | None:
+        """
+        Runs the search for the given mode. Returns (matching names, status text,
+        name -> (name span, value span) for highlighting), or None if cancelled.
+        Fuzzy and structured searches have no single match span, so nothing is highlighted.
+        A 'component:' query uses the component index in every mode.
+        """
+        component = search_query.parse_component_query(query)
+        if component is not None:
+            matching_names, spans = self._search_engine.component_search(component)
+            return matching_names, f"{len(matching_names)} with component", spans
+        if mode == "fuzzy":
+            # Ranking is limited to the top N, so the type filter has to apply before ranking
+            if filter_state == "user":
+                include = self.user_env_vars.__contains__
+            elif filter_state == "system":
+                include = lambda name: name in self.system_env_vars and name not in self.user_env_vars
+            else:
+                include = None
+            matching_names = self._search_engine.fuzzy_search(
+                query, self.FUZZY_RESULT_LIMIT, include=include, is_cancelled=is_cancelled
+            )
+            return None if matching_names is None else (matching_names, "", {})
+        if mode == "regex" and query:
+            try:
+                result = self._search_engine.regex_search(query, is_cancelled=is_cancelled)
+            except regex.error: # While the pattern is still being typed
+                return [], "invalid pattern", {}
+            if result is None:
+                return None
+            matching_names, scanned, budget_hit, spans = result
+            status = f"{scanned} scanned"
+            if budget_hit:
+                status += ", time budget hit"
+            return matching_names, status, spans
+        if search_query.is_structured_query(query):
+            predicates = search_query.compile_query(query, self._var_type, filter_state)
+            matching_names = self._search_engine.predicate_search(predicates, is_cancelled=is_cancelled)
+            return None if matching_names is None else (matching_names, "", {})
+        result = self._search_engine.search_with_spans(query, is_cancelled=is_cancelled)
+        return None if result is None else (result[0], "", result[1])
+
+    def _var_type(self, name: str) -> str:
+        """Returns 'user' or 'system' for a loaded variable (used by type: queries)."""
+        return "user" if name in self.user_env_vars else "system"
+
+    def _schedule_search(self, delay_ms: int) -> None:
+        """(Re)starts the debounce timer; any search still in flight becomes stale."""
+        if delay_ms <= 0:
+            self._restart_search() # Textual timers cannot have a zero interval
+            return
+        self._search_generation += 1
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        self._search_timer = self.set_timer(delay_ms / 1000, self._start_search)
+
+    def _restart_search(self) -> None:
+        """Starts the search right away (no debounce); any pending or running search becomes stale."""
+        self._search_generation += 1
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        self._start_search()
+
     def watch_search_term(self, old_value: str, new_value: str) -> None:
-        """Called when the search_term reactive variable changes."""
-        self.update_table()
+        """Called when the search_term reactive variable changes. Debounces the search."""
+        self._schedule_search(self._search_debounce_ms)
+
+    def _search_cache_key(self, query: str, mode: str, filter_state: str) -> Tuple:
+        """Result cache key; the query is normalized the same way the search mode treats it."""
+        if search_query.parse_component_query(query) is not None:
+            normalized = query.strip() # Paths are case-sensitive
+        elif mode == "fuzzy":
+            normalized = "".join(query.lower().split()) # Fuzzy ignores case and spaces
+        elif mode == "regex":
+            normalized = query # Case matters for escapes like \W vs \w
+        else:
+            normalized = query.lower()
+        return (filter_state, mode, normalized, self._store_version)
+
+    def _start_search(self) -> None:
+        """Debounce timer callback: filter for the latest search term in a worker."""
+        self._search_timer = None
+        cache_key = self._search_cache_key(self.search_term, self.search_mode, self.filter_state)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None: # Seen this exact search before; no need for a worker
+            self._apply_search_results(self._search_generation, *cached, cache_key)
+            return
+        self._run_search(self.search_term, self.search_mode, self.filter_state, self._search_generation, cache_key)
+
+    @work(thread=True, exclusive=True, group="search")
+    def _run_search(self, query: str, mode: str, filter_state: str, generation: int, cache_key: Tuple) -> None:
+        """Runs the search off the UI thread. Exclusive, so a new search cancels the old one."""
+        worker = get_current_worker()
+        result = self._compute_matches(
+            query, mode, filter_state,
+            is_cancelled=lambda: worker.is_cancelled or generation != self._search_generation,
+        )
+        if result is None or worker.is_cancelled:
+            return # Superseded; the newer search will update the table
+        matching_names, status, spans = result
+        self.call_from_thread(self._apply_search_results, generation, matching_names, status, spans, cache_key)
+
+    def _apply_search_results(
+        self,
+        generation: int,
+        matching_names: List[str],
+        status: str,
+        spans: Dict[str, Tuple],
+        cache_key: Tuple,
+    ) -> None:
+        """Refresh the table from a finished search, unless a newer search has started."""
+        if generation != self._search_generation:
+            return
+        self._search_status = status
+        self._search_spans = spans
+        self._update_filter_status_label()
+        self.update_table(matching_names, cache_key)
+
+    def _update_filter_status_label(self) -> None:
+        """Show the current filter (and non-default search mode / search status) above the table."""
+        filter_label = self.query_one("#filter-status-label", Static)
+        display_text = f"<{self.filter_state.replace('_', ' ')}>"
+        if self.search_mode != "substring":
+            display_text += f" ({self.search_mode})"
+        if self._search_status:
+            display_text += f" - {self._search_status}"
+        if not self._classified:
+            display_text += " - reading RC file..."
+        if self.staging_mode or self._pending_rc:
+            display_text += f" - staging: {len(self._pending_rc)} pending RC change(s)"
+        filter_label.update(display_text)
 
     def watch_filter_state(self, old_state: str, new_state: str) -> None:
         """Update the filter status label when the filter state changes."""
         # print(f"DEBUG: watch_filter_state: {old_state} -> {new_state}") # Debug
         try:
-            filter_label = self.query_one("#filter-status-label", Static)
-            # Format the display string
-            display_text = f"<{new_state.replace('_', ' ')}>"
-            filter_label.update(display_text)
+            self._update_filter_status_label()
             # Also trigger table update when filter changes
-            self.update_table()
+            self._refresh_table()
+        except Exception as e:
+            print(f"ERROR: Could not update filter status label: {e}")
+
+    def _refresh_table(self) -> None:
+        """
+        Re-filters the table after the filter or the variables changed. Fuzzy, regex and
+        structured queries scan every variable, so they run in the worker (as when typing);
+        other searches are cheap enough to update the table right away.
+        """
+        query = self.search_term
+        if query and search_query.parse_component_query(query) is None and (
+            self.search_mode != "substring" or search_query.is_structured_query(query)
+        ):
+            self._restart_search() # Also makes any search started for the old state stale
+            return
+        # A search still running was started for the old state; its rows must not be cached under its key
+        self._search_generation += 1
+        self.update_table()
+
+    def watch_search_mode(self, old_mode: str, new_mode: str) -> None:
+        """Update the status label and re-run the search when the search mode changes."""
+        try:
+            self._update_filter_status_label()
         except Exception as e:
             print(f"ERROR: Could not update filter status label: {e}")
+        self._restart_search() # No need to debounce an explicit mode switch
 
 
     def watch_selected_var_details(self, old_value: tuple[str, str], new_value: tuple[str, str]) -> None:
@@ -309,6 +793,8 @@ class EnvTuiApp(App):
         # Use query instead of query_one to avoid errors if widgets aren't ready/visible
         name_labels = self.query("#detail-name")
         value_statics = self.query("#detail-value")
+        self._update_detail_components(name)
+        self._update_detail_provenance(name)
 
         if name_labels and value_statics:
             name_label = name_labels[0]
@@ -316,7 +802,8 @@ class EnvTuiApp(App):
             # Always update the static view first
             if name:
                 name_label.update(f"[b]{name}[/b]")
-                value_static.update(value)
+                spans = self._search_spans.get(name)
+                value_static.update(highlight(value, spans[1] if spans else None)) # Same match as the table
             else:
                 name_label.update("Select a variable")
                 value_static.update("")
@@ -329,6 +816,55 @@ class EnvTuiApp(App):
                     edit_text_areas[0].text = value # Update text area content if needed
 
 
+    def _update_detail_components(self, name: str) -> None:
+        """Lists the components of a PATH-like variable (position and path) below its value."""
+        component_statics = self.query("#detail-components")
+        if not component_statics:
+            return
+        component_static = component_statics[0]
+        components = self._search_engine.components(name) if name else []
+        component_static.set_class(not components, "hidden")
+        if not components:
+            component_static.update("")
+            return
+        # Highlight the component a 'component:' search matched, if any
+        spans = self._search_spans.get(name)
+        matched_offset = spans[1][0] if spans and spans[1] else None
+        lines = Text(f"Components ({len(components)}):")
+        for position, (component, offset) in enumerate(components):
+            lines.append(f"\n{position:>3}  ")
+            lines.append(component, style=HIGHLIGHT_STYLE if offset == matched_offset else "")
+        component_static.update(lines)
+
+
+    def _update_detail_provenance(self, name: str) -> None:
+        """Lists where the RC files define the variable (file:line and the line), marking the one that wins."""
+        provenance_statics = self.query("#detail-provenance")
+        if not provenance_statics:
+            return
+        provenance_static = provenance_statics[0]
+        definitions = self._provenance.get(name, []) if name else []
+        provenance_static.set_class(not definitions, "hidden")
+        if not definitions:
+            provenance_static.update("")
+            return
+        winners = self._winning_definitions(definitions)
+        title = "Defined in" if len(definitions) == 1 else f"Defined {len(definitions)} times (last one wins)"
+        home = str(Path.home())
+        lines = Text(f"{title}:")
+        for definition in definitions:
+            wins = definition in winners
+            shell = f"[{definition.shell}] " if definition.shell else ""
+            path = "~" + definition.path[len(home):] if definition.path.startswith(home + os.sep) else definition.path
+            lines.append(f"\n{'>' if wins else ' '} {shell}{path}:{definition.line}  ", style="bold" if wins else "")
+            lines.append(definition.text, style="" if wins else "dim")
+        provenance_static.update(lines)
+
+    @staticmethod
+    def _winning_definitions(definitions: List[shell_utils.Definition]) -> List[shell_utils.Definition]:
+        """The definition that takes effect in each shell (the last one it runs)."""
+        return list({definition.shell: definition for definition in definitions}.values())
+
     def watch_edit_mode(self, old_value: bool, new_value: bool) -> None:
         """Show/hide edit widgets when edit_mode changes."""
         # print("DEBUG: watch_edit_mode called") # Optional debug
@@ -452,9 +988,63 @@ class EnvTuiApp(App):
              view_container.set_class(False, "hidden")
 
 
+    def watch_review_mode(self, old_value: bool, new_value: bool) -> None:
+        """Show/hide the pending-changes pane when review_mode changes."""
+        review_containers = self.query("#review-changes-container")
+        view_containers = self.query("#view-value-container")
+        if not review_containers or not view_containers:
+            return # Widgets not ready
+        review_containers[0].set_class(not new_value, "hidden")
+        if new_value:
+            view_containers[0].set_class(True, "hidden")
+            self._update_review_pane()
+            self.set_timer(0.1, lambda: self.query_one("#review-close", Button).focus())
+        elif not self.edit_mode and not self.add_mode and not self.delete_mode:
+            view_containers[0].set_class(False, "hidden")
+
+    def _update_review_pane(self) -> None:
+        """Lists the staged RC changes followed by the diff committing them would write."""
+        review_statics = self.query("#review-diff")
+        if not review_statics:
+            return
+        changes = self._pending_rc.changes()
+        if not changes:
+            review_statics[0].update("No staged changes. Press s to turn staging mode on or off.")
+            return
+        home = str(Path.home())
+        short = lambda path: "~" + path[len(home):] if path.startswith(home + os.sep) else path
+        lines = Text()
+        for change in changes:
+            if change.value is None:
+                lines.append(f"remove {change.name}", style="red")
+            else:
+                lines.append(f"set    {change.name}={change.value}", style="green")
+            lines.append(f"  ({short(change.path)})\n", style="dim")
+        try:
+            diff = self._pending_rc.diff()
+        except Exception as e:
+            diff = ""
+            lines.append(f"\nCould not compute the diff: {e}\n", style="red")
+        for diff_line in diff.splitlines():
+            style = ""
+            if diff_line.startswith(("+++", "---")):
+                style = "bold"
+            elif diff_line.startswith("+"):
+                style = "green"
+            elif diff_line.startswith("-"):
+                style = "red"
+            elif diff_line.startswith("@@"):
+                style = "cyan"
+            lines.append("\n" + diff_line, style=style)
+        review_statics[0].update(lines)
+
     # --- Actions ---
     def action_toggle_edit(self) -> None:
         """Toggle edit mode for the selected variable."""
+        if not self.edit_mode and not self._require_classified():
+            return
+        if self.review_mode: # Close the pending-changes pane
+            self.review_mode = False
         if self.add_mode: # Exit add mode if active
             self.add_mode = False
         if self.delete_mode: # Exit delete mode if active
@@ -467,6 +1057,10 @@ class EnvTuiApp(App):
 
     def action_toggle_add(self) -> None:
         """Toggle add variable mode."""
+        if not self.add_mode and not self._require_classified():
+            return
+        if self.review_mode: # Close the pending-changes pane
+            self.review_mode = False
         if self.edit_mode: # Exit edit mode if active
             self.edit_mode = False
         if self.delete_mode: # Exit delete mode if active
@@ -477,8 +1071,125 @@ class EnvTuiApp(App):
     def action_quit(self) -> None:
         """Called when the user presses q or Ctrl+C."""
         print("DEBUG: action_quit called") # Optional debug
+        if self._pending_rc and not self._quit_warned:
+            self._quit_warned = True # Quitting again discards them
+            self.notify(
+                f"{len(self._pending_rc)} staged RC change(s) are not committed. Press p to review "
+                "and commit them, or quit again to discard them.",
+                title="Uncommitted Changes", severity="warning", timeout=10,
+            )
+            return
         self.exit() # This will trigger on_unmount where saving happens
 
+    def action_toggle_staging(self) -> None:
+        """Toggle staging mode: Update RC stages edits instead of writing the file each time."""
+        self.staging_mode = not self.staging_mode
+
+    def watch_staging_mode(self, old_value: bool, new_value: bool) -> None:
+        if new_value:
+            self.notify("Update RC now stages changes. Press p to review and commit them.", title="Staging Mode On")
+        elif self._pending_rc:
+            self.notify(
+                f"Update RC writes right away again; {len(self._pending_rc)} staged change(s) are still pending (p).",
+                title="Staging Mode Off",
+            )
+        else:
+            self.notify("Update RC writes right away again.", title="Staging Mode Off")
+        try:
+            self._update_filter_status_label()
+        except Exception as e:
+            print(f"ERROR: Could not update filter status label: {e}")
+
+    def action_review_changes(self) -> None:
+        """Toggle the pane listing the staged RC changes and the resulting diff."""
+        if self.edit_mode:
+            self.edit_mode = False
+        if self.add_mode:
+            self.add_mode = False
+        if self.delete_mode:
+            self.delete_mode = False
+        self.review_mode = not self.review_mode
+
+    def _commit_pending_changes(self) -> None:
+        """Writes all staged RC changes (one read-modify-write per file)."""
+        written, failed = self._pending_rc.commit()
+        self._quit_warned = False
+        # Committed variables stay as they are; those of files that failed can still be discarded
+        pending_names = {change.name for change in self._pending_rc.changes()}
+        self._staged_originals = {
+            name: state for name, state in self._staged_originals.items() if name in pending_names
+        }
+        self._update_filter_status_label()
+        if failed:
+            errors = "\n".join(f"[i]{path}[/i]: {error}" for path, error in failed)
+            self.notify(
+                f"Could not write:\n{errors}\nTheir changes are still pending.",
+                title="Config Update Error", severity="error", timeout=12,
+            )
+            self._update_review_pane()
+            return
+        files = "\n".join(f"[i]{path}[/i]" for path in written) or "(no file needed changes)"
+        self.notify(
+            f"Committed the staged changes to:\n{files}\n"
+            f"[b]Note:[/b] This change will only apply to [u]new[/u] shell sessions.",
+            title="Config File Updated (Persistent)", timeout=12,
+        )
+        self.review_mode = False
+
+    def _discard_pending_changes(self) -> None:
+        """Throws the staged RC changes away and shows the variables as they were before them."""
+        count = len(self._pending_rc)
+        self._pending_rc.discard()
+        self._quit_warned = False
+        self._restore_staged_originals()
+        self._update_filter_status_label()
+        self._refresh_table()
+        var_name = self.selected_var_details[0]
+        if var_name:
+            value = self._all_env_vars_combined.get(var_name)
+            self.selected_var_details = (var_name, value) if value is not None else ("", "")
+            self.selected_var_source = (
+                None if value is None else "User" if var_name in self.user_env_vars else "System"
+            )
+        self.notify(f"Discarded {count} staged RC change(s); no file was changed.", title="Changes Discarded")
+        self.review_mode = False
+
+    def _before_rc_update(self, name: str, pending_rc: rc_transaction.RcTransaction | None) -> None:
+        """Called before Update RC changes name: staging records its state, a direct write keeps it."""
+        if pending_rc is None:
+            self._staged_originals.pop(name, None) # Written now; discarding must not roll it back
+        elif name not in self._staged_originals:
+            self._staged_originals[name] = (
+                self.user_env_vars.get(name),
+                self._all_env_vars_combined.get(name),
+                name in self.session_changes,
+                self.session_changes.get(name),
+            )
+
+    def _restore_staged_originals(self) -> None:
+        """Puts the staged variables back as they were before staging (values, type, session changes)."""
+        for name, (user_value, value, had_session_change, session_change) in self._staged_originals.items():
+            if user_value is None:
+                self.user_env_vars.pop(name, None)
+            else:
+                self.user_env_vars[name] = user_value
+            if user_value is not None or value is None:
+                self.system_env_vars.pop(name, None) # Was not a system variable before staging
+            if value is None:
+                self._all_env_vars_combined.pop(name, None)
+                self._search_engine.remove(name)
+                self._display_cache.discard(name)
+            else:
+                self._all_env_vars_combined[name] = value
+                self._search_engine.set(name, value)
+            if had_session_change:
+                self.session_changes[name] = session_change
+            else:
+                self.session_changes.pop(name, None)
+        if self._staged_originals:
+            self._store_version += 1 # Invalidates cached search results
+        self._staged_originals = {}
+
     def action_clear_search(self) -> None:
         """Called when the user presses Escape."""
         try:
@@ -492,11 +1203,17 @@ class EnvTuiApp(App):
                 self.add_mode = False # Exit add mode
             if self.delete_mode:
                 self.delete_mode = False # Exit delete mode
+            if self.review_mode:
+                self.review_mode = False # Close the pending-changes pane
         except Exception as e:
             self.notify(f"Error clearing search: {e}", severity="error")
 
     def action_request_delete(self) -> None:
         """Enter delete confirmation mode for the selected variable."""
+        if not self._require_classified():
+            return
+        if self.review_mode: # Close the pending-changes pane
+            self.review_mode = False
         if self.edit_mode: # Exit edit mode if active
             self.edit_mode = False
         if self.add_mode: # Exit add mode if active
@@ -553,14 +1270,66 @@ class EnvTuiApp(App):
         current_value = self._all_env_vars_combined.get(var_name, var_value) # Fallback just in case
 
         try:
-            quoted_value = shlex.quote(current_value)
-            export_statement = f'export {var_name}={quoted_value}'
+            # In the syntax of the user's shell (set -gx for fish)
+            export_statement = rc_document.export_command(var_name, current_value, rc_document.shell_syntax())
             pyperclip.copy(export_statement)
             self.notify(f"Copied export statement for [b]{var_name}[/b]", title="Copy Export")
         except Exception as e:
             self.notify(f"Failed to copy export statement: {e}", title="Copy Error", severity="error")
 
 
+    def _find_editor(self) -> str | None:
+        """$EDITOR, else the first common editor installed; notifies if there is none."""
+        editor = os.environ.get('EDITOR')
+        if not editor:
+            # Try common fallbacks
+            for fallback in ['vim', 'nano', 'emacs', 'vi']: # Add more if needed
+                if shutil.which(fallback):
+                    editor = fallback
+                    break
+        if not editor:
+            self.notify("Could not find a suitable text editor.\nSet the EDITOR environment variable.", severity="error", title="Edit Error")
+        return editor
+
+    def action_jump_to_definition(self) -> None:
+        """Opens the RC file line that defines the selected variable (the one that wins) in $EDITOR."""
+        var_name = self.selected_var_details[0]
+        if not var_name:
+            self.notify("No variable selected.", severity="warning")
+            return
+        if not self._require_classified():
+            return
+        definitions = self._provenance.get(var_name)
+        if not definitions:
+            self.notify(f"'{var_name}' is not defined in your shell config files.", severity="warning")
+            return
+        # The one that wins; in the multi-shell view, the one $SHELL runs (if it defines it)
+        current_shell = os.path.basename(os.environ.get("SHELL", ""))
+        winners = self._winning_definitions(definitions)
+        definition = next((d for d in winners if d.shell == current_shell), definitions[-1])
+        editor = self._find_editor()
+        if not editor:
+            return
+        # $EDITOR may carry options (e.g. "code -w"); +LINE is understood by vi, vim, nano, emacs, micro...
+        command = shlex.split(editor) + [f"+{definition.line}", definition.path]
+        with self.suspend_process():
+            print(f"\n--- EnvTui Suspended ---")
+            print(f"Opening {definition.path}:{definition.line} ('{var_name}') in {editor}.")
+            print(f"------------------------")
+            try:
+                process = subprocess.run(command, check=False)
+                if process.returncode != 0:
+                    print(f"\n--- Editor exited with code {process.returncode} ---")
+            except Exception as e:
+                print(f"\n--- Error launching editor: {e} ---")
+                self.call_later(self.notify, f"Error launching editor {editor}: {e}", severity="error", title="Edit Error")
+
+    def action_cycle_search_mode(self) -> None:
+        """Cycle the search bar between substring, fuzzy and regex matching."""
+        current_index = self.SEARCH_MODES.index(self.search_mode)
+        self.search_mode = self.SEARCH_MODES[(current_index + 1) % len(self.SEARCH_MODES)]
+        self.notify(f"Search mode: [b]{self.search_mode}[/b]", title="Search Mode", timeout=2)
+
     # Removed action_cycle_filter as it's handled by on_key now
 
 
@@ -603,7 +1372,7 @@ class EnvTuiApp(App):
         # print(f"DEBUG: Key pressed: {event.key}, Focused: {self.focused}") # Debug
         if event.key in ("right", "left"):
             try:
-                table = self.query_one("#combined-env-table", DataTable)
+                table = self._get_table()
                 # Check if the DataTable itself is the focused widget
                 if self.focused is table:
                     current_index = self.FILTER_STATES.index(self.filter_state)
@@ -628,6 +1397,23 @@ class EnvTuiApp(App):
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button clicks for Save/Cancel/Actions."""
         button_id = event.button.id
+        # "Update All Shells" (multi-shell view) is "Update RC" writing to every selected shell's file
+        rc_config_files = None # Default: the $SHELL config file
+        if button_id in self.ALL_SHELLS_BUTTONS:
+            button_id = self.ALL_SHELLS_BUTTONS[button_id]
+            rc_config_files = shell_utils.get_shell_write_targets(config.load_rc_shells_setting())
+
+        # --- Pending-changes pane ---
+        if button_id == "review-commit":
+            self._commit_pending_changes()
+            return
+        if button_id == "review-discard":
+            self._discard_pending_changes()
+            return
+        if button_id == "review-close":
+            self.review_mode = False
+            return
+        pending_rc = self._pending_rc if self.staging_mode else None # Staging mode: Update RC only stages
 
         # --- Cancel Actions ---
         if button_id == "edit-cancel":
@@ -686,11 +1472,16 @@ class EnvTuiApp(App):
             # Pass the correct dictionary to shell_utils if updating RC
             vars_to_pass = self.user_env_vars if update_rc_requested else self._all_env_vars_combined
 
+            if update_rc_requested:
+                self._before_rc_update(var_name, pending_rc)
             # Perform the update using shell_utils
             tui_updated, updated_user_vars = shell_utils.save_variable(
                 var_name, new_value, button_id, is_new=False,
-                all_env_vars=vars_to_pass, notify=self._notify_wrapper
+                all_env_vars=vars_to_pass, notify=self._notify_wrapper, config_files=rc_config_files,
+                pending=pending_rc
             )
+            if pending_rc is not None:
+                self._update_filter_status_label() # Pending change count
 
             # Exit edit mode regardless of which button was pressed
             self.edit_mode = False
@@ -703,16 +1494,18 @@ class EnvTuiApp(App):
                     print(f"DEBUG: Recorded session change (edit): {var_name}={new_value}")
 
                 self.user_env_vars = updated_user_vars # Update user vars
-                # Rebuild combined dictionary
-                self._all_env_vars_combined = {**self.system_env_vars, **self.user_env_vars}
+                # Update the combined dictionary and sorted index for just this variable
+                self._all_env_vars_combined[var_name] = new_value
+                self._search_engine.set(var_name, new_value)
+                self._store_version += 1 # Invalidates cached search results
                 # Update reactive details and table
                 self.selected_var_details = (var_name, new_value) # Show new value
                 self.selected_var_source = "user" # It's now definitely a user var
-                self.update_table()
+                self._refresh_table()
                 # Try to move cursor in the combined table after update
                 def move_cursor_post_update():
                     try:
-                        table = self.query_one("#combined-env-table", DataTable)
+                        table = self._get_table()
                         row_index = table.get_row_index(var_name)
                         table.move_cursor(row=row_index, animate=True)
                         # Re-select after moving cursor to ensure focus and details are correct
@@ -742,16 +1535,8 @@ class EnvTuiApp(App):
             current_value = edit_text_area.text
             var_name = self.editing_var_name
 
-            # Find editor
-            editor = os.environ.get('EDITOR')
-            if not editor:
-                # Try common fallbacks
-                for fallback in ['vim', 'nano', 'emacs', 'vi']: # Add more if needed
-                    if shutil.which(fallback):
-                        editor = fallback
-                        break
+            editor = self._find_editor()
             if not editor:
-                self.notify("Could not find a suitable text editor.\nSet the EDITOR environment variable.", severity="error", title="Edit Error")
                 return
 
             try:
@@ -848,11 +1633,16 @@ class EnvTuiApp(App):
             update_rc_requested = button_id == "add-save-rc"
             vars_to_pass = self.user_env_vars if update_rc_requested else self._all_env_vars_combined
 
+            if update_rc_requested:
+                self._before_rc_update(var_name, pending_rc)
             # Perform the add using shell_utils
             tui_updated, updated_user_vars = shell_utils.save_variable(
                 var_name, new_value, button_id, is_new=True,
-                all_env_vars=vars_to_pass, notify=self._notify_wrapper
+                all_env_vars=vars_to_pass, notify=self._notify_wrapper, config_files=rc_config_files,
+                pending=pending_rc
             )
+            if pending_rc is not None:
+                self._update_filter_status_label() # Pending change count
 
             # Exit add mode regardless of which button was pressed
             self.add_mode = False
@@ -865,16 +1655,18 @@ class EnvTuiApp(App):
                     print(f"DEBUG: Recorded session change (add): {var_name}={new_value}")
 
                 self.user_env_vars = updated_user_vars # Update user vars
-                 # Rebuild combined dictionary
-                self._all_env_vars_combined = {**self.system_env_vars, **self.user_env_vars}
+                # Update the combined dictionary and sorted index for just this variable
+                self._all_env_vars_combined[var_name] = new_value
+                self._search_engine.set(var_name, new_value)
+                self._store_version += 1 # Invalidates cached search results
                 # Clear details pane and update table
                 self.selected_var_details = ("", "")
                 self.selected_var_source = None
-                self.update_table()
+                self._refresh_table()
                  # Try to move cursor in combined table after update
                 def move_cursor_post_update():
                     try:
-                        table = self.query_one("#combined-env-table", DataTable)
+                        table = self._get_table()
                         row_index = table.get_row_index(var_name)
                         table.move_cursor(row=row_index, animate=True)
                         # Select the newly added var after moving cursor
@@ -911,11 +1703,16 @@ class EnvTuiApp(App):
             # Pass the correct dictionary to shell_utils if updating RC
             vars_to_pass = self.user_env_vars if update_rc_requested else self._all_env_vars_combined
 
+            if update_rc_requested:
+                self._before_rc_update(var_name, pending_rc)
             # Perform the deletion using shell_utils
             tui_updated, updated_user_vars = shell_utils.delete_variable(
                 var_name, button_id,
-                all_env_vars=vars_to_pass, notify=self._notify_wrapper
+                all_env_vars=vars_to_pass, notify=self._notify_wrapper, config_files=rc_config_files,
+                pending=pending_rc
             )
+            if pending_rc is not None:
+                self._update_filter_status_label() # Pending change count
 
             # Exit delete mode regardless of which button was pressed
             self.delete_mode = False
@@ -928,12 +1725,19 @@ class EnvTuiApp(App):
                     print(f"DEBUG: Recorded session change (delete): {var_name}")
 
                 self.user_env_vars = updated_user_vars # Update user vars
-                # Rebuild combined dictionary
-                self._all_env_vars_combined = {**self.system_env_vars, **self.user_env_vars}
+                # Update the combined dictionary and sorted index for just this variable
+                if var_name in self.system_env_vars: # Still present as a system var
+                    self._all_env_vars_combined[var_name] = self.system_env_vars[var_name]
+                    self._search_engine.set(var_name, self.system_env_vars[var_name])
+                else:
+                    self._all_env_vars_combined.pop(var_name, None)
+                    self._search_engine.remove(var_name)
+                    self._display_cache.discard(var_name)
+                self._store_version += 1 # Invalidates cached search results
                 # Clear details pane and update table
                 self.selected_var_details = ("", "")
                 self.selected_var_source = None
-                self.update_table()
+                self._refresh_table()
             else:
                 # If the action didn't update the RC file (e.g., Copy Cmd, Launch Term),
                 # re-select the variable to ensure it remains visible (if it still exists in combined).
@@ -959,7 +1763,7 @@ class EnvTuiApp(App):
         try:
             if event.input.id == "search-input":
                 # Move focus to the combined table if it has rows
-                table = self.query_one("#combined-env-table", DataTable)
+                table = self._get_table()
                 if table.row_count > 0:
                     table.focus()
             # Removed Enter handling for edit-input (TextArea handles Enter differently)
@@ -1035,10 +1839,11 @@ class EnvTuiApp(App):
                 self.selected_var_source = None
 
 
-def main(): # Define the main function
-    """Runs the EnvTuiApp."""
-    app = EnvTuiApp()
+def main(all_shells: bool = False): # Define the main function
+    """Runs the EnvTuiApp (the env-tui command parses arguments in cli.py first)."""
+    app = EnvTuiApp(all_shells=all_shells)
     app.run()
 
 if __name__ == "__main__":
-    main() # Call the main function
+    import cli # Same arguments as the env-tui command (e.g. --list, --get)
+    sys.exit(cli.main())
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import config
+
+RC_CACHE_FILE_NAME = "rc_cache.json"
+# Bump when the cache layout changes; the parser passes its own version so parser fixes
+# invalidate old results too
+RC_CACHE_FORMAT = 2
+# Files modified this recently are not cached: a second edit within the filesystem's mtime
+# granularity could keep size and mtime unchanged and the cache would go stale unnoticed
+RACY_MTIME_SECONDS = 2.0
+
+# A cached parse result: field -> list of strings (e.g. {"vars": [...], "sources": [...]})
+ParseResult = Dict[str, List[str]]
+
+
+def get_cache_path() -> Path:
+    return config.get_config_dir() / RC_CACHE_FILE_NAME
+
+
+def file_key(stat_result: os.stat_result) -> Dict[str, int]:
+    """
+    What identifies one version of a file: device, inode, size and mtime (ns). ctime is
+    included as well: tools that restore the mtime after writing cannot fake it.
+    """
+    return {
+        "dev": stat_result.st_dev,
+        "inode": stat_result.st_ino,
+        "size": stat_result.st_size,
+        "mtime_ns": stat_result.st_mtime_ns,
+        "ctime_ns": stat_result.st_ctime_ns,
+    }
+
+
+def _is_parse_result(value: Any) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(field, str) and isinstance(items, list) and all(isinstance(item, str) for item in items)
+        for field, items in value.items()
+    )
+
+
+class RcParseCache:
+    """
+    Parse results of RC files (one entry per file, so editing one included file only
+    invalidates that file), loaded from and saved to ~/.config/env_tui/rc_cache.json.
+    get()/put() are thread-safe; save() writes the file once, if anything changed.
+    """
+
+    def __init__(self, parser_version: int) -> None:
+        self._parser_version = parser_version
+        self._entries = self._read_entries()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _read_entries(self) -> Dict[str, Any]:
+        """All cache entries, or {} if the cache is missing, unreadable or from another version."""
+        try:
+            data = json.loads(get_cache_path().read_text())
+        except (OSError, ValueError):
+            return {}
+        if (not isinstance(data, dict) or data.get("format") != RC_CACHE_FORMAT
+                or data.get("parser") != self._parser_version or not isinstance(data.get("entries"), dict)):
+            return {}
+        return data["entries"]
+
+    def get(self, path: str, stat_result: os.stat_result) -> ParseResult | None:
+        """
+        The cached parse result for path if it was cached for exactly this version of the
+        file (stat_result from a single os.stat), else None. Anything malformed is a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        if not isinstance(entry, dict) or entry.get("key") != file_key(stat_result):
+            return None
+        result = entry.get("result")
+        return result if _is_parse_result(result) else None
+
+    def put(self, path: str, stat_result: os.stat_result, result: ParseResult) -> None:
+        """Remembers the parse result for this version of path (written by save())."""
+        if time.time() - max(stat_result.st_mtime, stat_result.st_ctime) < RACY_MTIME_SECONDS:
+            return # Just modified; see RACY_MTIME_SECONDS
+        with self._lock:
+            self._entries[os.path.abspath(path)] = {"key": file_key(stat_result), "result": result}
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Writes the cache if it changed. Written atomically (temp file + rename), so a
+        crash never leaves a half-written cache. Errors are only reported.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"format": RC_CACHE_FORMAT, "parser": self._parser_version, "entries": self._entries}
+            self._dirty = False
+        cache_path = get_cache_path()
+        tmp_name = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=cache_path.parent, prefix=".rc_cache.", suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_name = tmp_file.name
+                json.dump(data, tmp_file)
+            os.replace(tmp_name, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write RC cache {cache_path}: {e}")
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
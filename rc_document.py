@@ -0,0 +1,631 @@
+import bisect
+import os
+import re
+import shlex
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+import rc_cache # file_key: what identifies one version of a file
+
+# Comment written above every export the app adds or updates
+MANAGED_COMMENT = "# Added/Updated by EnvTuiApp"
+_MANAGED_PREFIX = MANAGED_COMMENT + "\n" # An entry holding the comment and its export line starts with this
+
+# Syntaxes an RC file can be written in
+POSIX = "posix" # bash, zsh, sh: export A=1 B=2, export A, declare -x / typeset -x A=1
+FISH = "fish" # set -gx A 1, set -Ux A 1 (fish also accepts export A=1)
+
+OPERATOR_CHARS = frozenset(";&|") # Separate commands on a line (;, &&, ||, |, &)
+# Words that can come before a command without changing what it does
+COMMAND_PREFIXES = frozenset({
+    "then", "do", "else", "{", "!", "builtin", "command", # POSIX
+    "begin", "and", "or", "not", # fish
+})
+# What a line needs to possibly export or source something (a cheap pre-check): a keyword,
+# or a '.' that can be a word of its own. The same patterns find these lines in the raw
+# bytes of large files (see rc_scanner), so both agree on which lines are looked at.
+_DOT_WORD = r"\.(?<![^ \t\r\n;&|'\"\\]\.)(?![^ \t\r\n;&|'\"])" # Lookbehind after the '.' keeps searches fast
+POSIX_KEYWORDS = ("export", "declare", "typeset", "source")
+FISH_KEYWORDS = ("set", "export", "source")
+CANDIDATE_PATTERNS = {
+    syntax: "|".join(keywords + (_DOT_WORD,))
+    for syntax, keywords in ((POSIX, POSIX_KEYWORDS), (FISH, FISH_KEYWORDS))
+}
+_CANDIDATE_RES = {syntax: re.compile(pattern) for syntax, pattern in CANDIDATE_PATTERNS.items()}
+# Prefixes after which the command cannot simply be dropped ('then' needs a body): a
+# removed command is replaced with the no-op ':' (POSIX) / 'true' (fish) instead
+BLOCK_PREFIXES = frozenset({"then", "do", "else", "{", "begin"})
+
+
+def syntax_for_path(path: str | None) -> str:
+    """The syntax of an RC file, from its name (config.fish and conf.d/*.fish are fish)."""
+    return FISH if path and path.endswith(".fish") else POSIX
+
+
+def shell_syntax() -> str:
+    """The syntax of the user's shell ($SHELL), for commands run in or pasted into it."""
+    return FISH if "fish" in os.path.basename(os.environ.get("SHELL", "")) else POSIX
+
+
+def fish_quote(value: str) -> str:
+    """Quotes value for fish (in single quotes only \\ and ' are special)."""
+    if value and all(char.isalnum() or char in "@%+=:,./-_" for char in value):
+        return value
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def quote_value(value: str, syntax: str = POSIX) -> str:
+    return fish_quote(value) if syntax == FISH else shlex.quote(value)
+
+
+def export_command(name: str, value: str, syntax: str = POSIX) -> str:
+    """The command that exports name=value in the given syntax."""
+    if syntax == FISH:
+        return f"set -gx {name} {fish_quote(value)}"
+    return f"export {name}={shlex.quote(value)}"
+
+
+def unset_command(name: str, syntax: str = POSIX) -> str:
+    """The command that removes name from the environment in the given syntax."""
+    if syntax == FISH:
+        return f"set -e {name}"
+    return f"unset {name}"
+
+
+def _is_name(text: str) -> bool:
+    """A valid variable name: ASCII letters, digits and underscores, not starting with a digit."""
+    return text.isascii() and text.isidentifier()
+
+
+class Token(NamedTuple):
+    text: str # The word with quotes and escapes removed (operators: the operator itself)
+    start: int # Raw span in the line
+    end: int
+    operator: bool
+
+
+# Lines without these need none of tokenize's special cases except plain quotes
+_SPECIAL_CHARS = re.compile(r"[\\`#(]")
+_SIMPLE_TOKEN = re.compile(r"""[;&|]+|(?:[^ \t\r;&|'"\\`#(]|'[^']*'|"[^"]*")+""")
+_QUOTES = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+
+
+def _tokenize_simple(line: str) -> List[Token] | None:
+    """
+    tokenize() for lines with no backslash, backtick, # or ( (most export lines), done
+    by regex. None if the line has an unterminated quote (tokenize handles that).
+    """
+    tokens = []
+    previous_end = 0
+    for match in _SIMPLE_TOKEN.finditer(line):
+        start, end = match.span()
+        if line[previous_end:start].strip(" \t\r"):
+            return None # Skipped an unterminated quote
+        previous_end = end
+        text = match.group()
+        if text[0] in OPERATOR_CHARS:
+            tokens.append(Token(text, start, end, True))
+        else:
+            if "'" in text:
+                text = _QUOTES.sub(r"\1\2", text) if '"' in text else text.replace("'", "")
+            elif '"' in text:
+                text = text.replace('"', "")
+            tokens.append(Token(text, start, end, False))
+    if line[previous_end:].strip(" \t\r"):
+        return None
+    return tokens
+
+
+def tokenize(line: str) -> List[Token]:
+    """
+    Splits one line into shell words and command operators in a single left-to-right
+    pass (no regex backtracking, so long or odd lines cost linear time). Quotes,
+    backslash escapes, $(...) and backticks stay inside their word; an unquoted # at
+    the start of a word ends the line. An unterminated quote runs to the end of the line.
+    """
+    if not _SPECIAL_CHARS.search(line):
+        tokens = _tokenize_simple(line)
+        if tokens is not None:
+            return tokens
+    tokens = []
+    length = len(line)
+    i = 0
+    while i < length:
+        char = line[i]
+        if char in " \t\r":
+            i += 1
+            continue
+        if char == "#":
+            break # Comment
+        start = i
+        if char in OPERATOR_CHARS:
+            while i < length and line[i] in OPERATOR_CHARS:
+                i += 1
+            tokens.append(Token(line[start:i], start, i, True))
+            continue
+        text = []
+        depth = 0 # Nesting of $( ... ) inside the word
+        while i < length:
+            char = line[i]
+            if depth == 0 and (char in " \t\r" or char in OPERATOR_CHARS):
+                break
+            if char == "\\" and i + 1 < length:
+                text.append(line[i + 1])
+                i += 2
+            elif char == "'":
+                end = line.find("'", i + 1)
+                end = length if end < 0 else end
+                text.append(line[i + 1:end])
+                i = end + 1
+            elif char == '"':
+                i += 1
+                while i < length and line[i] != '"':
+                    if line[i] == "\\" and i + 1 < length:
+                        i += 1
+                    text.append(line[i])
+                    i += 1
+                i += 1
+            elif char == "`":
+                end = line.find("`", i + 1)
+                end = length if end < 0 else end
+                text.append(line[i:end + 1])
+                i = end + 1
+            else:
+                if char == "(" and i > 0 and line[i - 1] == "$":
+                    depth += 1
+                elif char == ")" and depth:
+                    depth -= 1
+                text.append(char)
+                i += 1
+        tokens.append(Token("".join(text), start, min(i, length), False))
+    return tokens
+
+
+def _split_commands(tokens: List[Token]) -> List[List[Token]]:
+    """The words of each command on a line (split at ;, &&, ||, | and &)."""
+    commands = [[]]
+    for token in tokens:
+        if token.operator:
+            commands.append([])
+        else:
+            commands[-1].append(token)
+    return [words for words in commands if words]
+
+
+# Where an unquoted quote, backslash or comment can start (a # only starts a comment at a word start)
+_QUOTE_OR_COMMENT = re.compile(r"""['"\\]|(?<![^ \t\r\n;&|(])#""")
+_DOUBLE_QUOTED_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL) # Up to the closing "
+_FISH_SINGLE_QUOTED_REST = re.compile(r"[^'\\]*(?:\\.[^'\\]*)*'", re.DOTALL) # fish allows \' and \\ in '...'
+
+
+def ends_in_quote(text: str, syntax: str = POSIX) -> bool:
+    """True if text ends inside a '...' or "..." string, i.e. the string continues on the next line."""
+    if "'" not in text and '"' not in text:
+        return False
+    position = 0
+    while True:
+        match = _QUOTE_OR_COMMENT.search(text, position)
+        if match is None:
+            return False
+        char = match.group()
+        if char == "#":
+            return False # The rest of the line is a comment
+        if char == "\\":
+            position = match.end() + 1
+            continue
+        if char == "'" and syntax != FISH:
+            end = text.find("'", match.end())
+            if end < 0:
+                return True
+            position = end + 1
+        else:
+            rest = (_DOUBLE_QUOTED_REST if char == '"' else _FISH_SINGLE_QUOTED_REST).match(text, match.end())
+            if rest is None:
+                return True
+            position = rest.end()
+
+
+def _posix_exports(words: List[Token]) -> List[Tuple[str, Tuple[int, int]]]:
+    """(name, span of its word) for each variable an export / declare -x / typeset -x exports."""
+    command = words[0].text
+    options = [word.text for word in words[1:] if word.text[:1] in "-+"]
+    if command == "export":
+        if any(option.startswith("-") and any(flag in option for flag in "npf") for option in options):
+            return [] # 'export -n' un-exports, 'export -p' only prints, 'export -f' exports functions
+    elif command in ("declare", "typeset"):
+        if not any(option.startswith("-") and "x" in option for option in options):
+            return [] # Not exported (e.g. 'declare -a ARR' or 'typeset +x A')
+        if any(option.startswith("-") and ("f" in option or "F" in option) for option in options):
+            return [] # 'declare -fx NAME' exports a function
+    else:
+        return []
+    exports = []
+    for word in words[1:]:
+        if word.text[:1] in "-+":
+            continue
+        name = word.text.partition("=")[0]
+        if _is_name(name):
+            exports.append((name, (word.start, word.end)))
+    return exports
+
+
+def _fish_exports(words: List[Token]) -> List[Tuple[str, Tuple[int, int]]]:
+    """(name, span from the name to the end of the values) for 'set -gx NAME values...'."""
+    if words[0].text == "export": # fish ships an 'export NAME=value' wrapper
+        return _posix_exports(words)
+    if words[0].text != "set":
+        return []
+    exported = False
+    for word in words[1:]:
+        text = word.text
+        if text == "--export":
+            exported = True
+        elif text in ("--erase", "--unexport", "--query", "--show", "--names", "--local", "--function"):
+            return [] # Not an export, or local to a block / function
+        elif text.startswith("--"):
+            continue # --global, --universal, --path, ...
+        elif text.startswith("-") and len(text) > 1:
+            if any(flag in text for flag in "euqSnlf"):
+                return [] # Erase / unexport / query / show / names / local / function-scoped
+            exported = exported or "x" in text
+        else: # The first non-option word is the name
+            if exported and _is_name(text):
+                return [(text, (word.start, words[-1].end))]
+            return []
+    return []
+
+
+class Export(NamedTuple):
+    """One place where a line exports a variable (spans are raw offsets into the line entry)."""
+    region: Tuple[int, int] # Rewritten on update: 'NAME=value' / 'NAME' (POSIX), 'NAME values...' (fish)
+    command: Tuple[int, int] # The whole command (e.g. 'export A=1 B=2'), after any then/do/else
+    sole: bool # The only variable this command exports
+    whole_line: bool # The command is all there is on the line
+    in_block: bool # The command follows then/do/else/{/begin (see BLOCK_PREFIXES)
+
+
+def parse_line(
+    line: str, syntax: str = POSIX, candidate: bool = False
+) -> Tuple[List[Tuple[str, Export]], List[str]]:
+    """
+    What one line exports, as (name, Export) pairs in line order (spans relative to the
+    line), and the arguments of its source/. directives. candidate: the line is already
+    known to match CANDIDATE_PATTERNS.
+    """
+    stripped = line.lstrip()
+    if not stripped or stripped.startswith("#") or not (candidate or _CANDIDATE_RES[syntax].search(line)):
+        return [], [] # Cannot export or source anything; skip tokenizing
+    commands = _split_commands(tokenize(line))
+    find_exports = _fish_exports if syntax == FISH else _posix_exports
+    exports = []
+    sources = []
+    for words in commands:
+        command_start = words[0].start # Includes prefixes like 'builtin', but not 'then'
+        in_block = False
+        while len(words) > 1 and words[0].text in COMMAND_PREFIXES:
+            if words[0].text in BLOCK_PREFIXES:
+                in_block = True
+                command_start = words[1].start
+            words = words[1:]
+        if words[0].text in ("source", ".") and len(words) > 1:
+            sources.append(words[1].text)
+            continue
+        command_exports = find_exports(words)
+        for name, region in command_exports:
+            exports.append((name, Export(
+                region,
+                (command_start, words[-1].end),
+                len(command_exports) == 1,
+                len(commands) == 1 and not in_block,
+                in_block,
+            )))
+    return exports, sources
+
+
+def _quote_end(lines: List[str], start: int, syntax: str = POSIX) -> int | None:
+    """
+    For a line that ends inside a quote (export A='one<newline>two'), the index of the
+    line where the quote closes, or None if it never does.
+    """
+    for end in range(start + 1, len(lines)):
+        if not ends_in_quote("\n".join(lines[start:end + 1]), syntax):
+            return end
+    return None
+
+
+def _comment_length(entry: str) -> int:
+    """Length of the managed comment (and its newline) an edit put in front of the entry's command, or 0."""
+    return len(_MANAGED_PREFIX) if entry.startswith(_MANAGED_PREFIX) else 0
+
+
+def _command_line(entry: str) -> str:
+    """The (first) line of the entry's command, stripped."""
+    return entry[_comment_length(entry):].partition("\n")[0].strip()
+
+
+class RcDocument:
+    """
+    A parsed RC file: its lines plus indexes built in one pass, so that reading,
+    saving and deleting all agree on what counts as an export.
+
+    lines holds one entry per line; deleted lines become None (and an inserted
+    managed comment is stored in the same entry as its export line), so line indices
+    never shift and every index stays valid while the document is edited in place.
+    An export whose quoted value spans several lines is one entry as well.
+    Lines are tokenized (see tokenize) and read in the file's syntax: POSIX (export
+    with several names, declare -x, typeset -x) or FISH (set -gx). Edits rewrite only
+    the affected variable's part of a line, in the same syntax.
+    """
+
+    def __init__(self, lines: List[str] | None = None, syntax: str = POSIX) -> None:
+        self.syntax = syntax
+        self.lines: List[str | None] = []
+        self.exports: Dict[str, List[int]] = {} # name -> indices of its export lines (ascending)
+        self.occurrences: Dict[Tuple[int, str], List[Export]] = {} # (line index, name) -> where it is exported
+        self.markers: Dict[int, int] = {} # export line index -> index of its managed comment line
+        self._line_names: Dict[int, List[str]] = {} # line index -> names it exports
+        self._line_sources: Dict[int, List[str]] = {} # line index -> source/. arguments on it
+        lines = lines or []
+        next_line = 0
+        for i, line in enumerate(lines):
+            if i < next_line:
+                continue # Part of the previous entry
+            index = self._append_line(line)
+            if index in self._line_names and ends_in_quote(line, syntax):
+                # The quoted value continues on the next lines: keep them in this entry
+                end = _quote_end(lines, i, syntax)
+                if end is not None:
+                    self._replace_line(index, "\n".join(lines[i:end + 1]))
+                    next_line = end + 1
+
+    @classmethod
+    def parse(cls, content: str, syntax: str = POSIX) -> "RcDocument":
+        return cls(content.splitlines(), syntax)
+
+    def _append_line(self, line: str) -> int:
+        """Appends one line and indexes it. Returns its index."""
+        index = len(self.lines)
+        self.lines.append(line)
+        self._index_line(index)
+        return index
+
+    def _index_line(self, index: int) -> None:
+        """Records the exports and source directives of the line entry at index."""
+        entry = self.lines[index]
+        offset = len(_MANAGED_PREFIX) if entry.startswith(_MANAGED_PREFIX) else 0
+        exports, sources = parse_line(entry[offset:] if offset else entry, self.syntax)
+        if sources:
+            self._line_sources[index] = sources
+        names = []
+        for name, export in exports:
+            if offset:
+                export = export._replace(
+                    region=(export.region[0] + offset, export.region[1] + offset),
+                    command=(export.command[0] + offset, export.command[1] + offset),
+                )
+            self.occurrences.setdefault((index, name), []).append(export) # 'export A=1; export A=2' has two
+            indices = self.exports.setdefault(name, [])
+            if not indices or indices[-1] < index:
+                indices.append(index)
+            elif index not in indices:
+                bisect.insort(indices, index) # Re-indexed line in the middle of the file
+            names.append(name)
+        if names:
+            self._line_names[index] = names
+            if index not in self.markers:
+                # Managed if the closest non-blank line above is our comment
+                previous = index - 1
+                while previous >= 0 and (self.lines[previous] is None or not self.lines[previous].strip()):
+                    previous -= 1
+                if previous >= 0 and self.lines[previous].strip() == MANAGED_COMMENT:
+                    self.markers[index] = previous
+
+    def _unindex_line(self, index: int) -> None:
+        """Forgets what was recorded for the line entry at index."""
+        for name in self._line_names.pop(index, []):
+            self.occurrences.pop((index, name), None)
+            indices = self.exports.get(name)
+            if indices and index in indices:
+                indices.remove(index)
+                if not indices:
+                    del self.exports[name]
+        self._line_sources.pop(index, None)
+
+    def _replace_line(self, index: int, entry: str | None) -> None:
+        """Replaces (None: deletes) the line entry at index and re-indexes only that line."""
+        self._unindex_line(index)
+        self.lines[index] = entry
+        if entry is None:
+            self.markers.pop(index, None)
+        else:
+            self._index_line(index)
+
+    # --- Queries ---
+
+    def definitions(self) -> List[Tuple[int, str, str]]:
+        """(line number, name, raw line) of every export, in file order (last one wins)."""
+        numbers = self._line_numbers(self._line_names)
+        return [
+            (numbers[index], name, _command_line(self.lines[index]))
+            for index in sorted(self._line_names) for name in self._line_names[index]
+        ]
+
+    def source_lines(self) -> List[Tuple[int, str]]:
+        """(line number, argument) of every source/. directive, in file order."""
+        numbers = self._line_numbers(self._line_sources)
+        return [
+            (numbers[index], source) for index in sorted(self._line_sources) for source in self._line_sources[index]
+        ]
+
+    def _line_numbers(self, indices) -> Dict[int, int]:
+        """1-based line numbers in the serialized file where the commands of the entries at indices start."""
+        numbers = {}
+        line_count = 0
+        for index, line in enumerate(self.lines):
+            if line is None:
+                continue
+            if index in indices:
+                numbers[index] = line_count + 1 + (1 if _comment_length(line) else 0)
+            line_count += line.count("\n") + 1
+        return numbers
+
+    # --- Edits (in place) ---
+
+    def set_export(self, name: str, value: str) -> bool:
+        """
+        Sets name to value wherever the file exports it, rewriting only that variable's
+        part of each line (adding the managed comment where it is missing), or appends
+        an export with the comment if name is not exported. Written in the document's
+        syntax. Returns True if an existing export was updated.
+        """
+        indices = self.exports.get(name)
+        if indices:
+            for index in list(indices):
+                entry = self.lines[index]
+                # Right to left, so the spans of the occurrences not rewritten yet stay valid
+                for occurrence in sorted(self.occurrences[(index, name)], key=lambda export: export.region, reverse=True):
+                    start, end = occurrence.region
+                    if self.syntax == FISH and not entry[start:end].startswith(f"{name}="):
+                        replacement = f"{name} {fish_quote(value)}" # set -gx NAME value
+                    else:
+                        replacement = f"{name}={quote_value(value, self.syntax)}"
+                    entry = entry[:start] + replacement + entry[end:]
+                combined = index not in self.markers
+                if combined:
+                    # The comment is kept in the same entry so no index shifts; the two
+                    # lines are split again when the file is re-parsed
+                    entry = f"{MANAGED_COMMENT}\n{entry}"
+                self._replace_line(index, entry)
+                if combined:
+                    self.markers[index] = index
+            return True
+        last = self._last_line()
+        if last is not None and last.strip():
+            self.lines.append("") # Blank line before the new block
+        marker = len(self.lines)
+        self.lines.append(MANAGED_COMMENT)
+        index = self._append_line(export_command(name, value, self.syntax))
+        self.markers[index] = marker
+        return False
+
+    def remove_export(self, name: str) -> bool:
+        """
+        Removes every export of name: whole lines go with their managed comment (and
+        the blank line the app put before it); on a line that exports other variables
+        or runs other commands too, only this variable's part is removed. Returns False
+        if name was not exported.
+        """
+        indices = self.exports.get(name)
+        if not indices:
+            return False
+        for index in list(indices):
+            occurrences = self.occurrences[(index, name)]
+            if len(occurrences) == 1 and occurrences[0].sole and occurrences[0].whole_line:
+                self._remove_line(index)
+                continue
+            entry = self.lines[index]
+            # Right to left, so the spans of the occurrences not removed yet stay valid
+            for occurrence in sorted(occurrences, key=lambda export: export.region, reverse=True):
+                entry = self._without(entry, occurrence)
+            if not entry[_comment_length(entry):].strip():
+                self._remove_line(index) # Every command on the line exported name
+            else:
+                self._replace_line(index, entry.rstrip())
+        return True
+
+    def _remove_line(self, index: int) -> None:
+        """Deletes the line entry at index with its managed comment (and the blank line the app put before it)."""
+        marker = self.markers.get(index)
+        self._replace_line(index, None)
+        if marker is not None and marker != index:
+            self.lines[marker] = None
+            before = marker - 1
+            while before >= 0 and self.lines[before] is None:
+                before -= 1
+            if before >= 0 and not self.lines[before].strip():
+                self.lines[before] = None
+
+    def _without(self, entry: str, occurrence: Export) -> str:
+        """entry with one export removed: just the variable, or its whole command if it is the only one."""
+        if not occurrence.sole:
+            # Just this variable and the space separating it from the next one
+            start, end = occurrence.region
+            while end < len(entry) and entry[end] in " \t":
+                end += 1
+            replacement = ""
+        elif occurrence.in_block:
+            start, end = occurrence.command
+            replacement = "true" if self.syntax == FISH else ":"
+        else:
+            # The command and the operator joining it to the next (or previous) one
+            start, end = occurrence.command
+            rest = entry[end:].lstrip(" \t")
+            operator = len(rest) - len(rest.lstrip(";&|"))
+            if operator:
+                end = len(entry) - len(rest[operator:].lstrip(" \t"))
+            else:
+                start = len(entry[:start].rstrip(" \t").rstrip(";&|").rstrip(" \t"))
+            replacement = ""
+        return entry[:start] + replacement + entry[end:]
+
+    def _last_line(self) -> str | None:
+        for line in reversed(self.lines):
+            if line is not None:
+                return line
+        return None
+
+    # --- Serialization ---
+
+    def serialize(self) -> str:
+        return "\n".join(line for line in self.lines if line is not None) + "\n"
+
+
+# Documents kept in memory per path, with the file version (rc_cache.file_key) they were
+# read at; reused as long as the file was not changed by someone else
+_documents: Dict[str, Tuple[Dict[str, int], RcDocument]] = {}
+_documents_lock = threading.Lock()
+
+
+def load_document(path: str) -> RcDocument:
+    """
+    The parsed document for path: the in-memory one if the file is unchanged, else the
+    file is read and parsed (an empty document if it does not exist yet).
+    """
+    path = os.path.abspath(path)
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        return RcDocument(syntax=syntax_for_path(path))
+    with _documents_lock:
+        cached = _documents.get(path)
+    if cached is not None and cached[0] == rc_cache.file_key(stat_result):
+        return cached[1]
+    document = RcDocument.parse(Path(path).read_text(), syntax_for_path(path))
+    remember_document(path, document, stat_result)
+    return document
+
+
+def remember_document(path: str, document: RcDocument, stat_result: os.stat_result) -> None:
+    """Keeps a document parsed from path (at stat_result) for later load_document calls."""
+    with _documents_lock:
+        _documents[os.path.abspath(path)] = (rc_cache.file_key(stat_result), document)
+
+
+def forget_document(path: str) -> None:
+    """Drops the in-memory document for path (the next load_document reads the file)."""
+    with _documents_lock:
+        _documents.pop(os.path.abspath(path), None)
+
+
+def save_document(path: str, document: RcDocument) -> None:
+    """
+    Writes the document back to path and keeps it in memory for the next edit. If the
+    write fails, the (already edited) document is dropped so it cannot be reused.
+    """
+    try:
+        Path(path).write_text(document.serialize())
+        remember_document(path, document, os.stat(path))
+    except Exception:
+        forget_document(path)
+        raise
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# Fast scanner for very large RC files (e.g. generated module-system or site bootstrap
+# profiles with tens of thousands of lines). The file is memory-mapped and searched with
+# one compiled byte pattern for the lines that can export or source something; only those
+# lines are decoded and tokenized. Results are the same as parsing the whole file with
+# rc_document.RcDocument (run this module for a benchmark that checks it).
+import codecs
+import locale
+import mmap
+import os
+import re
+from typing import List, NamedTuple, Tuple
+
+import rc_document # parse_line and the candidate-line patterns shared with the full parser
+
+SCAN_MIN_BYTES = 64 * 1024 # Smaller files are parsed in full (and the document kept for saves)
+
+# Line breaks str.splitlines() knows besides \n: files containing any are parsed in full
+# (each is looked for with find(), which is much faster than a regex over the whole file)
+ASCII_LINE_BREAKS = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e")
+UNICODE_LINE_BREAKS = ("\x85", "\u2028", "\u2029")
+ASCII_CHECK_CHUNK = 1024 * 1024 # Bytes copied at a time to check the file is ASCII
+_BYTE_PATTERNS = {syntax: re.compile(pattern.encode()) for syntax, pattern in rc_document.CANDIDATE_PATTERNS.items()}
+_TEXT_PATTERNS = {syntax: re.compile(pattern) for syntax, pattern in rc_document.CANDIDATE_PATTERNS.items()}
+
+
+class ScanResult(NamedTuple):
+    definitions: List[Tuple[int, str, str]] # As RcDocument.definitions()
+    source_lines: List[Tuple[int, str]] # As RcDocument.source_lines()
+
+
+def scan_file(path: str, syntax: str = rc_document.POSIX) -> ScanResult | None:
+    """
+    The exports and source/. directives of the RC file at path, found without splitting
+    the whole file into lines. Returns None when the file has to be parsed in full
+    instead (line breaks other than \\n, or a locale encoding other than UTF-8/ASCII).
+    Decoding errors are raised, as reading the file as text would.
+    """
+    encoding = codecs.lookup(locale.getpreferredencoding(False)).name # What Path.read_text() uses
+    if encoding not in ("utf-8", "ascii"):
+        return None
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return ScanResult([], []) # Empty files cannot be mapped
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if any(buffer.find(line_break) >= 0 for line_break in ASCII_LINE_BREAKS):
+                return None
+            if not _is_ascii(buffer):
+                # Decoding the whole file validates it like read_text(); still only candidate lines are tokenized
+                text = buffer[:].decode(encoding)
+                if any(line_break in text for line_break in UNICODE_LINE_BREAKS):
+                    return None
+                return _scan(text, _TEXT_PATTERNS[syntax], "\n", syntax)
+            return _scan(buffer, _BYTE_PATTERNS[syntax], b"\n", syntax)
+
+
+def _is_ascii(buffer: mmap.mmap) -> bool:
+    return all(
+        buffer[start:start + ASCII_CHECK_CHUNK].isascii() for start in range(0, len(buffer), ASCII_CHECK_CHUNK)
+    )
+
+
+def _scan(buffer, pattern: re.Pattern, newline, syntax: str) -> ScanResult:
+    """Jumps from one candidate line to the next in buffer (ASCII bytes or str)."""
+    definitions = []
+    source_lines = []
+    line_number = 1
+    counted_to = 0 # Line breaks before this offset are counted in line_number
+    position = 0
+    length = len(buffer)
+    while position < length:
+        match = pattern.search(buffer, position)
+        if match is None:
+            break
+        start = buffer.rfind(newline, 0, match.start()) + 1
+        end = buffer.find(newline, match.end())
+        end = length if end < 0 else end
+        line_number += buffer[counted_to:start].count(newline)
+        counted_to = start
+        line = buffer[start:end]
+        if not isinstance(line, str):
+            line = line.decode("ascii")
+        exports, sources = rc_document.parse_line(line, syntax, candidate=True)
+        if exports and rc_document.ends_in_quote(line, syntax):
+            # A quoted value continuing on the next lines belongs to this command (as in RcDocument)
+            end, line = _quote_end(buffer, newline, start, end, line, syntax)
+            exports, sources = rc_document.parse_line(line, syntax, candidate=True)
+        if exports:
+            text = line.partition("\n")[0].strip()
+            definitions.extend((line_number, name, text) for name, _ in exports)
+        source_lines.extend((line_number, source) for source in sources)
+        position = end + 1
+    return ScanResult(definitions, source_lines)
+
+
+def _quote_end(buffer, newline, start: int, end: int, line: str, syntax: str) -> Tuple[int, str]:
+    """
+    For a line (buffer[start:end]) ending inside a quote: the end offset and text of the
+    lines up to where the quote closes, or the line itself if it never closes.
+    """
+    next_end = end
+    while next_end < len(buffer):
+        next_end = buffer.find(newline, next_end + 1)
+        next_end = len(buffer) if next_end < 0 else next_end
+        text = buffer[start:next_end]
+        if not isinstance(text, str):
+            text = text.decode("ascii")
+        if not rc_document.ends_in_quote(text, syntax):
+            return next_end, text
+    return end, line
+
+
+def _synthetic_rc(line_count: int) -> str:
+    """
+    A generated profile in the style of module systems and site bootstrap scripts: mostly
+    functions, tests and PATH edits, with one export per 20-line block.
+    """
+    lines = []
+    for i in range(line_count // 20):
+        root = f"/opt/site/pkg{i}/1.{i % 10}.0"
+        lines += [
+            f"# --- module pkg{i}/1.{i % 10}.0 (generated, do not edit) ---",
+            f"_pkg{i}_load() {{",
+            f"    if [ -d {root} ] && [ -z \"${{PKG{i}_LOADED:-}}\" ]; then",
+            f"        PKG{i}_ROOT={root}",
+            f"        export PKG{i}_HOME=\"$PKG{i}_ROOT\" PKG{i}_VERSION=1.{i % 10}.0",
+            f"        case \":$PATH:\" in",
+            f"            *\":$PKG{i}_ROOT/bin:\"*) ;;",
+            f"            *) PATH=\"$PKG{i}_ROOT/bin:$PATH\" ;;",
+            "        esac",
+            f"        LD_LIBRARY_PATH=\"$PKG{i}_ROOT/lib64:${{LD_LIBRARY_PATH:-}}\"",
+            f"        MANPATH=\"$PKG{i}_ROOT/share/man:${{MANPATH:-}}\"",
+            f"        PKG{i}_LOADED=1",
+            "    fi",
+            "}",
+            f"alias pkg{i}-info='cat {root}/README.txt'",
+            f"_site_modules=\"$_site_modules pkg{i}\"",
+            f"[ -r /etc/site/pkg{i}.sh ] && . /etc/site/pkg{i}.sh" if i % 50 == 0 else f"_pkg{i}_load",
+            f"unset -f _pkg{i}_load 2>/dev/null || true",
+            f"test -n \"$SITE_DEBUG\" && echo \"loaded pkg{i}\" >&2",
+            "",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _benchmark(line_count: int = 50_000, rounds: int = 5) -> None:
+    """Times the full parse against the scanner on a synthetic RC file and checks they agree."""
+    import tempfile
+    import time
+    from pathlib import Path
+
+    def best_time(function) -> float:
+        times = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "generated_profile.sh")
+        Path(path).write_text(_synthetic_rc(line_count))
+        full = lambda: rc_document.RcDocument.parse(Path(path).read_text())
+        document = full()
+        scanned = scan_file(path)
+        assert scanned is not None
+        assert scanned.definitions == document.definitions(), "definitions differ"
+        assert scanned.source_lines == document.source_lines(), "source directives differ"
+        full_seconds = best_time(full)
+        scan_seconds = best_time(lambda: scan_file(path))
+        print(f"{len(document.lines)} lines, {os.path.getsize(path) // 1024} KiB, "
+              f"{len(scanned.definitions)} exports, {len(scanned.source_lines)} source directives (identical)")
+        print(f"full parse: {full_seconds * 1000:8.1f} ms")
+        print(f"scanner:    {scan_seconds * 1000:8.1f} ms ({full_seconds / scan_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,100 @@
+import difflib
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+import rc_document # Parsed RC file model; each file is edited through one document
+
+
+class PendingChange(NamedTuple):
+    path: str # Absolute path of the RC file
+    name: str
+    value: str | None # None: remove the export
+
+
+class RcTransaction:
+    """
+    RC edits staged instead of written right away (staging mode). A later change to the
+    same variable in the same file replaces the earlier one. diff() shows what committing
+    would write; commit() applies each file's changes in a single read-modify-write.
+    """
+
+    def __init__(self) -> None:
+        self._changes: Dict[Tuple[str, str], PendingChange] = {} # (path, name) -> change, in staging order
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def set_export(self, path: str, name: str, value: str) -> None:
+        self._stage(PendingChange(os.path.abspath(path), name, value))
+
+    def remove_export(self, path: str, name: str) -> None:
+        self._stage(PendingChange(os.path.abspath(path), name, None))
+
+    def _stage(self, change: PendingChange) -> None:
+        key = (change.path, change.name)
+        self._changes.pop(key, None) # Re-staged changes move to the end
+        self._changes[key] = change
+
+    def changes(self) -> List[PendingChange]:
+        return list(self._changes.values())
+
+    def paths(self) -> List[str]:
+        """The files with pending changes, in staging order."""
+        return list(dict.fromkeys(change.path for change in self._changes.values()))
+
+    def discard(self) -> None:
+        self._changes.clear()
+
+    def _apply(self, path: str, document: rc_document.RcDocument) -> bool:
+        """Applies the changes for path to document. Returns whether anything changed."""
+        changed = False
+        for change in self._changes.values():
+            if change.path != path:
+                continue
+            if change.value is None:
+                changed = document.remove_export(change.name) or changed
+            else:
+                document.set_export(change.name, change.value)
+                changed = True
+        return changed
+
+    def diff(self) -> str:
+        """Unified diff of every file with pending changes against its current contents."""
+        diffs = []
+        for path in self.paths():
+            try:
+                before = Path(path).read_text()
+            except FileNotFoundError:
+                before = ""
+            # A fresh document: the one load_document keeps must not see uncommitted edits
+            document = rc_document.RcDocument.parse(before, rc_document.syntax_for_path(path))
+            if not self._apply(path, document):
+                continue
+            diffs.extend(difflib.unified_diff(
+                before.splitlines(keepends=True), document.serialize().splitlines(keepends=True),
+                fromfile=path, tofile=f"{path} (pending)",
+            ))
+        return "".join(diffs)
+
+    def commit(self) -> Tuple[List[str], List[Tuple[str, Exception]]]:
+        """
+        Writes the pending changes: each file is read (or taken from memory), edited and
+        written once. Returns (files written, [(file, error)]); the changes of files that
+        failed stay pending, the others are cleared.
+        """
+        written, failed = [], []
+        for path in self.paths():
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                document = rc_document.load_document(path)
+                if self._apply(path, document):
+                    rc_document.save_document(path, document)
+                    written.append(path)
+            except Exception as e:
+                rc_document.forget_document(path) # May be partly edited
+                failed.append((path, e))
+                continue
+            for key in [key for key in self._changes if key[0] == path]:
+                del self._changes[key]
+        return written, failed
@@ -0,0 +1,182 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+import rc_cache # file_key: what identifies one version of a file
+
+POLL_INTERVAL_SECONDS = 2.0 # How often the stat-polling fallback checks the files
+SETTLE_SECONDS = 0.15 # After an inotify event, wait this long for the rest of the save to land
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Directory events that can mean a watched file changed (editors often save by writing a
+# new file and renaming it over the old one, so the file itself cannot be watched)
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, length of the name that follows
+
+
+class _Inotify:
+    """Minimal inotify binding (ctypes, no extra dependency). Raises OSError if unavailable."""
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this system")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, directory: str) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"Cannot watch {directory}: {os.strerror(error)}")
+        return wd
+
+    def remove_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """All pending events as (wd, mask, name); [] if there are none."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+                offset += name_length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class RcWatcher:
+    """
+    Reports which of a set of files (the RC file and its includes) changed. Uses inotify
+    on Linux, watching each file's directory so files that do not exist yet or are
+    replaced by a rename are seen too; polls os.stat every POLL_INTERVAL_SECONDS when
+    inotify is unavailable (or mode is "poll"). A file only counts as changed if its
+    identity (rc_cache.file_key) differs, so events that did not alter it are ignored.
+    Not thread-safe: use it from one thread (the watching worker).
+    """
+
+    def __init__(self, paths: Iterable[str], mode: str = "auto") -> None:
+        self._keys: Dict[str, Dict[str, int] | None] = {} # path -> file_key (None: missing)
+        self._directories: Dict[str, Tuple[int, Set[str]]] = {} # directory -> (wd, watched names)
+        self._wd_names: Dict[int, Set[str]] = {} # wd -> names watched in that directory
+        self._last_poll = time.monotonic()
+        self._inotify = None
+        if mode == "auto":
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                print(f"DEBUG: inotify unavailable ({e}); polling RC files instead")
+        self.watch(paths)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def watch(self, paths: Iterable[str]) -> None:
+        """Sets the files to watch. Files already watched keep their last seen version."""
+        paths = {os.path.abspath(path) for path in paths}
+        self._keys = {path: self._keys[path] if path in self._keys else _stat_key(path) for path in paths}
+        if self._inotify is None:
+            return
+        wanted: Dict[str, Set[str]] = {}
+        for path in paths:
+            # A symlinked RC file (e.g. into a dotfiles repo) is also edited at its target
+            for candidate in {path, os.path.realpath(path)}:
+                directory, name = os.path.split(candidate)
+                wanted.setdefault(directory, set()).add(name)
+        try:
+            for directory in list(self._directories):
+                if directory not in wanted:
+                    wd, _ = self._directories.pop(directory)
+                    self._wd_names.pop(wd, None)
+                    self._inotify.remove_watch(wd)
+            for directory, names in wanted.items():
+                if directory in self._directories:
+                    wd = self._directories[directory][0]
+                elif os.path.isdir(directory):
+                    wd = self._inotify.add_watch(directory)
+                else:
+                    continue # Its changes are still seen by the periodic check in wait()
+                self._directories[directory] = (wd, names)
+                self._wd_names[wd] = names
+        except OSError as e:
+            # E.g. the inotify watch limit is reached: poll instead
+            print(f"DEBUG: {e}; polling RC files instead")
+            self._inotify.close()
+            self._inotify = None
+            self._directories.clear()
+            self._wd_names.clear()
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        Waits up to timeout seconds and returns the watched files that changed since
+        the last call (an empty set if none did). Short timeouts keep the caller responsive
+        to cancellation; polling still happens only every POLL_INTERVAL_SECONDS.
+        """
+        if self._inotify is None:
+            time.sleep(timeout)
+            if time.monotonic() - self._last_poll < POLL_INTERVAL_SECONDS:
+                return set()
+            self._last_poll = time.monotonic()
+            return self._changed()
+        readable, _, _ = select.select([self._inotify.fd], [], [], timeout)
+        relevant = bool(readable) and self._relevant(self._inotify.read_events())
+        if time.monotonic() - self._last_poll >= POLL_INTERVAL_SECONDS * 5:
+            relevant = True # Now and then anyway, e.g. for files in directories created later
+        if not relevant:
+            return set()
+        time.sleep(SETTLE_SECONDS)
+        self._inotify.read_events() # Drop the rest of the same save
+        self._last_poll = time.monotonic()
+        return self._changed()
+
+    def _relevant(self, events: List[Tuple[int, int, str]]) -> bool:
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW or name in self._wd_names.get(wd, ()):
+                return True
+        return False
+
+    def _changed(self) -> Set[str]:
+        changed = set()
+        for path, old_key in self._keys.items():
+            new_key = _stat_key(path)
+            if new_key != old_key:
+                self._keys[path] = new_key
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def _stat_key(path: str) -> Dict[str, int] | None:
+    try:
+        return rc_cache.file_key(os.stat(path))
+    except OSError:
+        return None
@@ -0,0 +1,638 @@
+import bisect
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# The third-party 'regex' module can abort a single runaway match; the stdlib 're'
+# cannot be interrupted and holds the GIL while matching, which would freeze the app.
+import regex
+
+# (start, end) of the first match in the name and in the value, or None where it did not match
+Span = Tuple[int, int]
+MatchSpans = Tuple[Optional[Span], Optional[Span]]
+
+# How many candidates a search reads per lock hold, and checks between cancellation polls
+CANCEL_CHECK_INTERVAL = 512
+# Length of the n-grams stored in the optional index (queries shorter than this scan linearly)
+NGRAM_LENGTH = 3
+
+# --- Fuzzy Scoring (fzf-style) ---
+FUZZY_SCORE_MATCH = 16 # Per matched character
+FUZZY_BONUS_BOUNDARY = 8 # Match at the start of the text or right after a separator
+FUZZY_BONUS_CONSECUTIVE = 4 # Match directly after the previous matched character
+FUZZY_PENALTY_GAP = 1 # Per unmatched character inside the match window
+FUZZY_BONUS_NAME = 32 # Name matches rank above equally good value matches
+FUZZY_BOUNDARY_CHARS = frozenset("_-/.:=, ")
+
+# --- Component Index (PATH-like list variables) ---
+# Variables that hold os.pathsep-separated lists; names ending in PATH or _DIRS count as well
+PATH_LIST_VARS = frozenset({
+    "PATH", "LD_LIBRARY_PATH", "PYTHONPATH", "MANPATH", "XDG_DATA_DIRS", "XDG_CONFIG_DIRS", "CLASSPATH",
+})
+PATH_LIST_SUFFIXES = ("PATH", "_DIRS")
+
+# --- Regex Search ---
+REGEX_CACHE_SIZE = 32 # Compiled patterns kept around (re-typing / toggling filters reuses them)
+REGEX_TIME_BUDGET = 0.25 # Seconds a single regex scan may take before it stops early
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_regex(pattern: str):
+    """Compiles a case-insensitive search pattern (cached). Raises regex.error if invalid."""
+    return regex.compile(pattern, regex.IGNORECASE)
+
+
+def _lower_offsets(text: str, lower: str) -> List[int] | None:
+    """
+    Where each character of text starts in lower (text.lower()), plus len(lower); None
+    if lowercasing kept every offset (no character, like 'İ', became several).
+    """
+    if len(lower) == len(text):
+        return None
+    offsets = [0]
+    for char in text:
+        offsets.append(offsets[-1] + len(char.lower()))
+    return offsets
+
+
+def _original_span(span: Span | None, offsets: List[int] | None) -> Span | None:
+    """Maps a span in the lowercased text back to the original text (see _lower_offsets)."""
+    if span is None or offsets is None:
+        return span
+    start, end = span
+    return bisect.bisect_right(offsets, start) - 1, bisect.bisect_left(offsets, end)
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Returns the set of distinct NGRAM_LENGTH-character substrings of text."""
+    return {text[i:i + NGRAM_LENGTH] for i in range(len(text) - NGRAM_LENGTH + 1)}
+
+
+def fuzzy_score(pattern: str, text: str) -> int | None:
+    """
+    Scores pattern as an ordered subsequence of text (both already lowercased).
+    Returns None if it does not match; higher scores are better matches.
+    Like fzf v1: find the first match end going forward, then the shortest window
+    ending there going backward, and score only that window.
+    """
+    if not pattern:
+        return 0
+    # Forward pass: end of the first (greedy) subsequence match
+    position = -1
+    for char in pattern:
+        position = text.find(char, position + 1)
+        if position < 0:
+            return None
+    # Backward pass: rightmost positions ending there give the shortest window
+    positions = []
+    end = position + 1
+    for char in reversed(pattern):
+        end = text.rfind(char, 0, end)
+        positions.append(end)
+    positions.reverse()
+
+    score = 0
+    previous = -2
+    for position in positions:
+        score += FUZZY_SCORE_MATCH
+        if position == 0 or text[position - 1] in FUZZY_BOUNDARY_CHARS:
+            score += FUZZY_BONUS_BOUNDARY
+        if position == previous + 1:
+            score += FUZZY_BONUS_CONSECUTIVE
+        previous = position
+    window = positions[-1] - positions[0] + 1
+    score -= (window - len(pattern)) * FUZZY_PENALTY_GAP
+    return score
+
+
+class ResultCache:
+    """
+    Small LRU cache of search results. Keys should include a store version so that
+    results computed before an add/edit/delete are simply never looked up again.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value (marking it recently used), or None."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Stores value, evicting the least recently used entry when full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+class SortedKeyIndex:
+    """
+    Variable names kept in sorted order. Adds and removes are bisect inserts/deletes
+    into a new list (copy-on-write), so listing in order is a linear walk with no
+    per-query sort, and a list returned by names() stays valid while it is walked.
+    """
+
+    def __init__(self, names=()) -> None:
+        self._names: List[str] = sorted(names)
+
+    def add(self, name: str) -> bool:
+        """Inserts name in order. Returns False if it was already present."""
+        index = bisect.bisect_left(self._names, name)
+        if index < len(self._names) and self._names[index] == name:
+            return False
+        self._names = self._names[:index] + [name] + self._names[index:]
+        return True
+
+    def discard(self, name: str) -> bool:
+        """Removes name. Returns False if it was not present."""
+        index = bisect.bisect_left(self._names, name)
+        if index < len(self._names) and self._names[index] == name:
+            self._names = self._names[:index] + self._names[index + 1:]
+            return True
+        return False
+
+    def names(self) -> List[str]:
+        """The sorted names (never modified once returned; callers must not modify it either)."""
+        return self._names
+
+    def __contains__(self, name: object) -> bool:
+        index = bisect.bisect_left(self._names, name)
+        return index < len(self._names) and self._names[index] == name
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram -> names whose (lowercased) name or value contains it.
+    Candidates for a query are the intersection of its trigrams' posting sets; they
+    still need a verify pass, since sharing every trigram does not imply a substring match.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = {}
+
+    def add(self, name: str, lower_name: str, lower_value: str) -> None:
+        """Index a variable's lowercased name and value."""
+        for gram in _ngrams(lower_name) | _ngrams(lower_value):
+            self._postings.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str, lower_name: str, lower_value: str) -> None:
+        """Remove a variable previously indexed with the same lowercased name and value."""
+        for gram in _ngrams(lower_name) | _ngrams(lower_value):
+            names = self._postings.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._postings[gram]
+
+    def candidates(self, search: str) -> Set[str]:
+        """Names that contain every trigram of search (search must be >= NGRAM_LENGTH chars)."""
+        postings = []
+        for gram in _ngrams(search):
+            names = self._postings.get(gram)
+            if not names:
+                return set() # Some trigram appears nowhere, so nothing can match
+            postings.append(names)
+        postings.sort(key=len) # Intersect starting from the rarest trigram
+        result = set(postings[0])
+        for names in postings[1:]:
+            result &= names
+            if not result:
+                break
+        return result
+
+
+def is_path_list(name: str) -> bool:
+    """True for variables whose value is a list of paths (PATH, PYTHONPATH, XDG_DATA_DIRS, ...)."""
+    return name in PATH_LIST_VARS or name.upper().endswith(PATH_LIST_SUFFIXES)
+
+
+def _normalize_component(component: str) -> str:
+    """'/opt/lib/' and '/opt/lib' are the same directory."""
+    return component.rstrip("/") or component
+
+
+def split_components(value: str) -> List[Tuple[str, int]]:
+    """Splits a PATH-like value into (component, start offset in value); empty entries are skipped."""
+    components = []
+    offset = 0
+    for component in value.split(os.pathsep):
+        if component:
+            components.append((component, offset))
+        offset += len(component) + len(os.pathsep)
+    return components
+
+
+class ComponentIndex:
+    """
+    Index of the components of PATH-like variables: each variable is split once, and
+    every (normalized) component maps to the set of variables containing it, so
+    "which variables contain /opt/cuda/lib64?" is a dict lookup.
+    """
+
+    def __init__(self) -> None:
+        self._components: Dict[str, List[Tuple[str, int]]] = {} # name -> [(component, offset)]
+        self._containing: Dict[str, Set[str]] = {} # normalized component -> names
+
+    def add(self, name: str, value: str) -> None:
+        """Index a variable (ignored unless it is PATH-like). Replaces any previous entry."""
+        self.remove(name)
+        if not is_path_list(name):
+            return
+        components = split_components(value)
+        self._components[name] = components
+        for component, _ in components:
+            self._containing.setdefault(_normalize_component(component), set()).add(name)
+
+    def remove(self, name: str) -> None:
+        """Drop a variable from the index (no-op if it is not indexed)."""
+        for component, _ in self._components.pop(name, ()):
+            key = _normalize_component(component)
+            names = self._containing.get(key)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._containing[key]
+
+    def components(self, name: str) -> List[Tuple[str, int]]:
+        """[(component, offset in value)] of a PATH-like variable, in order ([] otherwise)."""
+        return self._components.get(name, [])
+
+    def lookup(self, component: str) -> Tuple[List[str], Dict[str, Span]]:
+        """
+        Sorted names having a component equal to component, or, when no component is
+        equal, containing it (case-sensitive, like paths). Also returns name -> value
+        span of the first such component, for highlighting.
+        """
+        key = _normalize_component(component)
+        if key in self._containing:
+            matches = lambda candidate: _normalize_component(candidate) == key
+            names = self._containing[key]
+        else:
+            matches = lambda candidate: key in candidate
+            names = set()
+            for candidate in self._containing: # Distinct components only, not every variable
+                if matches(candidate):
+                    names |= self._containing[candidate]
+        spans = {}
+        for name in names:
+            for candidate, offset in self._components[name]:
+                if matches(_normalize_component(candidate)):
+                    spans[name] = (offset, offset + len(candidate))
+                    break
+        return sorted(names), spans
+
+
+class SearchEngine:
+    """
+    Incremental, case-insensitive substring search over environment variables.
+
+    Each name/value is lowercased once when it is loaded. Results for the
+    queries typed so far are kept on a stack, so a query that extends the
+    previous one only re-checks the previous result set, and a backspace
+    pops back to the cached (wider) result.
+
+    All methods are thread-safe so searches can run in a worker thread. Updates change
+    the lowered values in place and bump a version; scans read them under the lock one
+    chunk at a time (see _chunks), so an add/edit/delete waits for at most one chunk and
+    never copies the whole map. Results of a scan that overlapped an update are not cached.
+
+    With use_index=True, a TrigramIndex is built (lazily, on the first long enough
+    query) and kept up to date by set()/remove(). Queries of NGRAM_LENGTH+ characters
+    then only verify the index's candidates instead of scanning every value.
+
+    PATH-like variables are also split into a ComponentIndex (see component_search).
+    """
+
+    def __init__(self, use_index: bool = False) -> None:
+        self._use_index = use_index
+        self._index: TrigramIndex | None = None # Built on first use when use_index is set
+        self._lowered: Dict[str, Tuple[str, str]] = {} # name -> (lower name, lower value)
+        self._version = 0 # Bumped on every load/set/remove
+        # name -> (_lower_offsets of name, of value), only for the few where lowercasing moved offsets
+        self._offsets: Dict[str, Tuple[List[int] | None, List[int] | None]] = {}
+        self._keys = SortedKeyIndex() # All names, kept in sorted order
+        self._components = ComponentIndex() # Components of PATH-like variables
+        # Stack of (query, matching names, match spans) for the current chain of narrowing queries
+        self._history: List[Tuple[str, List[str], Dict[str, MatchSpans]]] = []
+        self._lock = threading.Lock() # Guards all of the above (searches run off the UI thread and take it per chunk)
+
+    # --- Loading / Incremental Updates ---
+
+    def load(self, env_vars: Dict[str, str]) -> None:
+        """Replace the indexed variables with env_vars."""
+        lowered = {name: (name.lower(), value.lower()) for name, value in env_vars.items()}
+        offsets = {}
+        components = ComponentIndex()
+        for name, value in env_vars.items():
+            components.add(name, value)
+            lower_name, lower_value = lowered[name]
+            if len(lower_name) != len(name) or len(lower_value) != len(value):
+                offsets[name] = (_lower_offsets(name, lower_name), _lower_offsets(value, lower_value))
+        with self._lock:
+            self._lowered = lowered
+            self._offsets = offsets
+            self._version += 1
+            self._keys = SortedKeyIndex(lowered)
+            self._components = components
+            self._index = None # Rebuilt on demand for the new variables
+            self._history.clear()
+
+    def set(self, name: str, value: str) -> None:
+        """Add or update a single variable."""
+        entry = (name.lower(), value.lower())
+        offsets = (_lower_offsets(name, entry[0]), _lower_offsets(value, entry[1]))
+        with self._lock:
+            previous = self._lowered.get(name)
+            if previous is None:
+                self._keys.add(name)
+            elif self._index is not None:
+                self._index.remove(name, *previous)
+            self._lowered[name] = entry
+            if offsets != (None, None):
+                self._offsets[name] = offsets
+            else:
+                self._offsets.pop(name, None)
+            self._version += 1
+            if self._index is not None:
+                self._index.add(name, *entry)
+            self._components.add(name, value) # Re-split only this variable
+            self._history.clear() # Cached results may no longer be valid
+
+    def remove(self, name: str) -> None:
+        """Remove a single variable (no-op if it is not indexed)."""
+        with self._lock:
+            previous = self._lowered.get(name)
+            if previous is None:
+                return
+            del self._lowered[name]
+            self._offsets.pop(name, None)
+            self._version += 1
+            if self._index is not None:
+                self._index.remove(name, *previous)
+            self._keys.discard(name)
+            self._components.remove(name)
+            self._history.clear()
+
+    # --- Querying ---
+
+    def search(
+        self,
+        query: str,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[List[str]]:
+        """
+        Return the sorted names whose name or value contains query (case-insensitive).
+
+        is_cancelled is polled periodically during the scan; if it returns True the
+        search stops early, nothing is cached and None is returned.
+        """
+        result = self.search_with_spans(query, is_cancelled)
+        return None if result is None else result[0]
+
+    def search_with_spans(
+        self,
+        query: str,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Tuple[List[str], Dict[str, MatchSpans]]]:
+        """
+        Like search(), but also returns name -> (name span, value span) of the first
+        match, recorded during the same pass (used for highlighting).
+        """
+        search = query.lower()
+        with self._lock:
+            if not search:
+                self._history.clear()
+                return self._keys.names(), {}
+
+            # Drop cached queries that the new query does not extend (e.g. after a backspace
+            # or an unrelated edit). What remains is the closest wider result set.
+            while self._history and not search.startswith(self._history[-1][0]):
+                self._history.pop()
+
+            if self._history and self._history[-1][0] == search:
+                return self._history[-1][1], self._history[-1][2] # Exact cache hit (e.g. backspace)
+
+            candidates = self._history[-1][1] if self._history else self._keys.names()
+            version = self._version
+
+        if self._use_index and len(search) >= NGRAM_LENGTH:
+            # Verify the index's candidates instead, if that means checking fewer names
+            index_candidates = self._index_candidates(search, version)
+            if index_candidates is not None and len(index_candidates) < len(candidates):
+                candidates = sorted(index_candidates)
+        length = len(search)
+        results = []
+        spans: Dict[str, MatchSpans] = {}
+        for chunk in self._chunks(candidates):
+            if is_cancelled and is_cancelled():
+                return None # Superseded by a newer query
+            for name, lower_name, lower_value in chunk:
+                name_start = lower_name.find(search)
+                value_start = lower_value.find(search)
+                if name_start >= 0 or value_start >= 0:
+                    results.append(name)
+                    spans[name] = (
+                        (name_start, name_start + length) if name_start >= 0 else None,
+                        (value_start, value_start + length) if value_start >= 0 else None,
+                    )
+        with self._lock:
+            self._map_spans(spans)
+            # Cache only if no variable changed and the stack still leads up to this query
+            top = self._history[-1][0] if self._history else ""
+            if self._version == version and search != top and search.startswith(top):
+                self._history.append((search, results, spans))
+        return results, spans
+
+    def _map_spans(self, spans: Dict[str, MatchSpans]) -> None:
+        """
+        Maps spans found in the lowercased texts back to the original ones, in place
+        (only a few variables need it; see _lower_offsets). Call holding the lock.
+        """
+        for name, (name_offsets, value_offsets) in self._offsets.items():
+            match = spans.get(name)
+            if match is not None:
+                spans[name] = (_original_span(match[0], name_offsets), _original_span(match[1], value_offsets))
+
+    def _chunks(self, names: List[str]):
+        """
+        Yields [(name, lower name, lower value)] for CANCEL_CHECK_INTERVAL of names at a
+        time, holding the lock only while one chunk is read. Names removed meanwhile are skipped.
+        """
+        for start in range(0, len(names), CANCEL_CHECK_INTERVAL):
+            with self._lock:
+                lowered = self._lowered
+                chunk = [
+                    (name, *entry) for name in names[start:start + CANCEL_CHECK_INTERVAL]
+                    if (entry := lowered.get(name)) is not None
+                ]
+            yield chunk
+
+    def _index_candidates(self, search: str, version: int) -> Set[str] | None:
+        """
+        The trigram index's candidates for search. The index is built on first use, a
+        chunk at a time. Returns None if the variables changed since version (the
+        candidates could then disagree with the names the search started from; the
+        next query builds or uses the index again).
+        """
+        with self._lock:
+            if self._version != version:
+                return None
+            if self._index is not None:
+                return self._index.candidates(search)
+            names = self._keys.names()
+        index = TrigramIndex()
+        for chunk in self._chunks(names):
+            for name, lower_name, lower_value in chunk:
+                index.add(name, lower_name, lower_value)
+        with self._lock:
+            if self._version != version:
+                return None
+            if self._index is None:
+                self._index = index
+            return self._index.candidates(search)
+
+    def fuzzy_search(
+        self,
+        query: str,
+        limit: int,
+        include: Optional[Callable[[str], bool]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[List[str]]:
+        """
+        Returns up to limit names ranked by fuzzy_score (best first, ties alphabetical).
+        Only names accepted by include (if given) are considered. A bounded heap keeps
+        just the best limit candidates, so nothing else is materialized.
+        Returns None if is_cancelled reports True during the scan.
+        """
+        pattern = "".join(query.lower().split()) # Spaces are ignored in fuzzy patterns
+        with self._lock:
+            names = self._keys.names()
+        if not pattern:
+            if include is not None:
+                names = [name for name in names if include(name)]
+            return names[:limit]
+
+        heap: List[Tuple[int, int, str]] = [] # (score, -sorted position, name); min-heap of the best
+        index = 0
+        for chunk in self._chunks(names):
+            if is_cancelled and is_cancelled():
+                return None
+            for name, lower_name, lower_value in chunk:
+                index += 1
+                if include is not None and not include(name):
+                    continue
+                name_score = fuzzy_score(pattern, lower_name)
+                value_score = fuzzy_score(pattern, lower_value)
+                if name_score is not None:
+                    name_score += FUZZY_BONUS_NAME
+                elif value_score is None:
+                    continue
+                score = max(score for score in (name_score, value_score) if score is not None)
+                item = (score, -index, name) # -index: earlier names win ties
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return [name for _, _, name in sorted(heap, reverse=True)]
+
+    def regex_search(
+        self,
+        pattern: str,
+        budget: float = REGEX_TIME_BUDGET,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Tuple[List[str], int, bool, Dict[str, MatchSpans]]]:
+        """
+        Returns (sorted matching names, rows scanned, budget exceeded, match spans) for a
+        regex search.
+        The scan stops once budget seconds have passed, returning the matches found so
+        far; a single match is also cut off at the remaining budget. Raises regex.error
+        for invalid patterns; returns None if cancelled.
+        """
+        compiled = compile_regex(pattern)
+        deadline = time.monotonic() + budget
+        with self._lock:
+            names = self._keys.names()
+        results = []
+        spans: Dict[str, MatchSpans] = {}
+        scanned = 0
+        budget_hit = False
+        for chunk in self._chunks(names):
+            if is_cancelled and is_cancelled():
+                return None
+            for name, lower_name, lower_value in chunk:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    budget_hit = True
+                    break
+                try:
+                    name_match = compiled.search(lower_name, timeout=remaining)
+                    value_match = compiled.search(lower_value, timeout=remaining)
+                except TimeoutError:
+                    budget_hit = True
+                    break
+                scanned += 1
+                if name_match or value_match:
+                    results.append(name)
+                    spans[name] = (
+                        name_match.span() if name_match else None,
+                        value_match.span() if value_match else None,
+                    )
+            if budget_hit:
+                break
+        with self._lock:
+            self._map_spans(spans)
+        return results, scanned, budget_hit, spans
+
+    def component_search(self, component: str) -> Tuple[List[str], Dict[str, MatchSpans]]:
+        """
+        Returns (sorted names of PATH-like variables containing component, match spans).
+        An exact component (trailing '/' ignored) is a single index lookup; otherwise
+        components containing the text match, so results show up while typing.
+        """
+        with self._lock:
+            names, value_spans = self._components.lookup(component)
+        return names, {name: (None, span) for name, span in value_spans.items()}
+
+    def components(self, name: str) -> List[Tuple[str, int]]:
+        """[(component, offset in value)] of a PATH-like variable ([] for other variables)."""
+        with self._lock:
+            return list(self._components.components(name))
+
+    def predicate_search(
+        self,
+        predicates: List[Callable[[str, str, str], bool]],
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[List[str]]:
+        """
+        Returns the sorted names accepted by every predicate (called as
+        predicate(name, lower_name, lower_value), in order, stopping at the first
+        rejection). Returns None if cancelled.
+        """
+        with self._lock:
+            names = self._keys.names()
+        results = []
+        for chunk in self._chunks(names):
+            if is_cancelled and is_cancelled():
+                return None
+            for name, lower_name, lower_value in chunk:
+                for predicate in predicates:
+                    if not predicate(name, lower_name, lower_value):
+                        break
+                else:
+                    results.append(name)
+        return results
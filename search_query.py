@@ -0,0 +1,111 @@
+import re
+import shlex
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+# A compiled predicate gets (name, lowercased name, lowercased value) and says whether the row matches
+Predicate = Callable[[str, str, str], bool]
+# Parsed term: (field, operator, argument, negated). field is "type", "name", "value", "len" or "any"
+Term = Tuple[str, str, str, bool]
+
+# Cheapest checks first: type facet (dict lookup), length (int compare), name (short string),
+# bare words (name, then value), value (potentially tens of KB)
+PREDICATE_COST = {"type": 0, "len": 1, "name": 2, "any": 3, "value": 4}
+
+_FIELD_PATTERN = re.compile(r"^(-?)(type|name|value):(.*)$", re.IGNORECASE)
+_LEN_PATTERN = re.compile(r"^(-?)len(<=|>=|<|>|=)(\d+)$", re.IGNORECASE)
+_LEN_OPERATORS = {
+    "<": lambda length, limit: length < limit,
+    "<=": lambda length, limit: length <= limit,
+    ">": lambda length, limit: length > limit,
+    ">=": lambda length, limit: length >= limit,
+    "=": lambda length, limit: length == limit,
+}
+
+
+# 'component:/opt/cuda/lib64' searches the components of PATH-like variables
+COMPONENT_PREFIX = "component:"
+
+
+def parse_component_query(query: str) -> str | None:
+    """The component searched for by a 'component:' query, or None for other queries."""
+    stripped = query.strip()
+    if stripped[:len(COMPONENT_PREFIX)].lower() == COMPONENT_PREFIX:
+        return stripped[len(COMPONENT_PREFIX):].strip()
+    return None
+
+
+def is_structured_query(query: str) -> bool:
+    """True if the query uses the field syntax (e.g. name:AWS_ len>1000) rather than plain text."""
+    for word in query.split():
+        if _FIELD_PATTERN.match(word) or _LEN_PATTERN.match(word):
+            return True
+    return False
+
+
+@lru_cache(maxsize=64)
+def parse_query(query: str) -> Tuple[Term, ...]:
+    """
+    Parses a search query such as 'name:AWS_ value:prod type:user len>1000 -name:TMP'.
+    Quoted arguments are allowed (value:"two words"); bare words match name or value;
+    a leading '-' negates a term. Cached, so each query is only parsed once.
+    """
+    try:
+        words = shlex.split(query)
+    except ValueError: # Unbalanced quotes while still typing
+        words = query.split()
+
+    terms = []
+    for word in words:
+        len_match = _LEN_PATTERN.match(word)
+        if len_match:
+            negated, operator, limit = len_match.groups()
+            terms.append(("len", operator, limit, bool(negated)))
+            continue
+        field_match = _FIELD_PATTERN.match(word)
+        if field_match:
+            negated, field, argument = field_match.groups()
+            if argument: # 'name:' on its own (still being typed) filters nothing
+                terms.append((field.lower(), "contains", argument.lower(), bool(negated)))
+            continue
+        if word.startswith("-") and len(word) > 1:
+            terms.append(("any", "contains", word[1:].lower(), True))
+        elif word:
+            terms.append(("any", "contains", word.lower(), False))
+    return tuple(terms)
+
+
+def _compile_term(term: Term, type_of: Callable[[str], str]) -> Predicate:
+    """Builds the predicate for a single parsed term."""
+    field, operator, argument, negated = term
+    if field == "type":
+        predicate = lambda name, lower_name, lower_value: type_of(name).startswith(argument)
+    elif field == "len":
+        compare, limit = _LEN_OPERATORS[operator], int(argument)
+        predicate = lambda name, lower_name, lower_value: compare(len(lower_value), limit)
+    elif field == "name":
+        predicate = lambda name, lower_name, lower_value: argument in lower_name
+    elif field == "value":
+        predicate = lambda name, lower_name, lower_value: argument in lower_value
+    else:
+        predicate = lambda name, lower_name, lower_value: argument in lower_name or argument in lower_value
+    if negated:
+        return lambda name, lower_name, lower_value: not predicate(name, lower_name, lower_value)
+    return predicate
+
+
+def compile_query(
+    query: str,
+    type_of: Callable[[str], str],
+    filter_state: str = "all",
+) -> List[Predicate]:
+    """
+    Compiles a query into a predicate chain ordered cheapest first, so most rows are
+    rejected before their value is looked at. type_of(name) returns "user" or "system";
+    a filter_state other than "all" adds an implicit type facet at the front.
+    """
+    terms = list(parse_query(query))
+    if filter_state != "all":
+        terms.append(("type", "contains", filter_state, False))
+    terms.sort(key=lambda term: PREDICATE_COST[term[0]]) # Stable, so typed order is kept per cost
+    return [_compile_term(term, type_of) for term in terms]
@@ -1,16 +1,24 @@
 import os
 import shlex
-import re # Added for parsing RC file
+import glob # For globs in sourced file paths
 import shutil
 import subprocess
 from pathlib import Path
-import pyperclip # For copy actions
+from concurrent.futures import ThreadPoolExecutor # Parallel reads of sourced RC files
+
+import rc_cache # Persistent cache of RC parse results
+import rc_document # Parsed RC file model shared by reading, saving and deleting
+import rc_scanner # Reads only the candidate lines of very large RC files
+import rc_transaction # Staged RC edits (staging mode)
 
 # Type hinting for callback functions
-from typing import Callable, Dict, Tuple, Set # Added Set
+from typing import Callable, Dict, List, NamedTuple, Tuple, Set # Added Set
 
 NotifyCallable = Callable[[str], None] # Simplified type for notify callback
 
+# Bump whenever the RC parsing below changes, so cached results from older parsers are dropped
+RC_PARSER_VERSION = 8
+
 def get_shell_config_file() -> str | None:
     """Try to determine the user's shell configuration file."""
     shell = os.environ.get("SHELL", "")
@@ -45,42 +53,276 @@ def get_shell_config_file() -> str | None:
         return os.path.expanduser(config_file) # Expand ~
     return None
 
-def get_user_defined_vars_from_rc() -> Set[str]:
+# Config files read in the multi-shell view (--all-shells), per shell. The first file of each
+# shell is the one written to when that shell has none of them yet.
+SHELL_RC_FILES: Dict[str, List[str]] = {
+    "bash": ["~/.bashrc", "~/.bash_profile"],
+    "sh": ["~/.profile"],
+    "zsh": ["~/.zshrc", "~/.zshenv"],
+    "fish": ["~/.config/fish/config.fish"],
+}
+
+MAX_RC_INCLUDE_DEPTH = 8 # Levels of nested source/. directives that are followed
+MAX_RC_READ_WORKERS = 8 # Threads reading included files (helps on network home directories)
+
+
+def _parse_rc_file(path: str, cache: rc_cache.RcParseCache) -> Dict[str, List[str]] | None:
+    """
+    Parse result of one RC file, from the cache if the file is unchanged (a single stat).
+    Returns None if the file cannot be read.
+    """
+    try:
+        stat_before = os.stat(path)
+        cached = cache.get(path, stat_before)
+        if cached is not None:
+            return cached
+        syntax = rc_document.syntax_for_path(path)
+        document = None
+        # Very large (usually generated) files: only the lines that can export or source are parsed
+        scanned = rc_scanner.scan_file(path, syntax) if stat_before.st_size >= rc_scanner.SCAN_MIN_BYTES else None
+        if scanned is not None:
+            definitions, source_lines = scanned
+        else:
+            document = rc_document.RcDocument.parse(Path(path).read_text(), syntax)
+            definitions, source_lines = document.definitions(), document.source_lines()
+        result = {
+            "vars": sorted({name for _, name, _ in definitions}),
+            "sources": [argument for _, argument in source_lines],
+            # Provenance, one "LINE\tNAME\tRAW LINE" / "LINE\tARGUMENT" string each (see build_provenance_index)
+            "definitions": [f"{line}\t{name}\t{raw}" for line, name, raw in definitions],
+            "includes": [f"{line}\t{argument}" for line, argument in source_lines],
+        }
+        # Only cache if the file did not change while it was being read
+        if rc_cache.file_key(os.stat(path)) == rc_cache.file_key(stat_before):
+            cache.put(path, stat_before, result)
+            if document is not None:
+                rc_document.remember_document(path, document, stat_before) # Saves can reuse it
+        return result
+    except Exception as e:
+        # Log or notify about the error if needed, but don't crash
+        print(f"Warning: Could not read or parse {path}: {e}")
+        return None
+
+
+def _expand_source(argument: str) -> List[str]:
+    """
+    Files a source/. argument refers to: ~ and $VARS are expanded, relative paths are
+    taken from the home directory (where login shells start), simple globs are expanded.
+    Arguments that still contain a $ (e.g. command substitution) are skipped.
+    """
+    expanded = os.path.expandvars(os.path.expanduser(argument))
+    if "$" in expanded or "`" in expanded:
+        return []
+    if not os.path.isabs(expanded):
+        expanded = str(Path.home() / expanded)
+    if glob.has_magic(expanded):
+        return sorted(glob.glob(expanded))
+    return [expanded]
+
+
+def collect_rc_files(
+    root: str | None = None,
+    reuse: Dict[str, Dict[str, List[str]]] | None = None,
+    cache: rc_cache.RcParseCache | None = None,
+) -> List[Tuple[str, Dict[str, List[str]]]]:
     """
-    Attempts to parse the user's shell config file to find 'export VAR=' lines.
+    The shell config file (or root) and every file it sources, recursively, as
+    [(path, parse result)] in breadth-first order. Each file is visited once (so source
+    cycles end), at most MAX_RC_INCLUDE_DEPTH levels deep. The files of each level are
+    read in parallel, and every file's parse result is cached on its own.
+    reuse maps paths to parse results known to be current (e.g. files the watcher saw
+    unchanged); those files are not even stat'ed. A cache passed in is shared with the
+    caller, who saves it; otherwise the cache is loaded and saved here.
+    """
+    reuse = reuse or {}
+    root = root or get_shell_config_file()
+    if not root or not os.path.isfile(root):
+        return []
+    own_cache = cache is None
+    if own_cache:
+        cache = rc_cache.RcParseCache(RC_PARSER_VERSION)
+    files = []
+    seen = {os.path.realpath(root)}
+    level = [root]
+    for depth in range(MAX_RC_INCLUDE_DEPTH + 1):
+        to_read = [path for path in level if path not in reuse]
+        if len(to_read) <= 1:
+            parsed = [_parse_rc_file(path, cache) for path in to_read]
+        else:
+            with ThreadPoolExecutor(max_workers=min(MAX_RC_READ_WORKERS, len(to_read))) as pool:
+                parsed = list(pool.map(lambda path: _parse_rc_file(path, cache), to_read))
+        parsed_by_path = dict(zip(to_read, parsed))
+        results = [reuse[path] if path in reuse else parsed_by_path[path] for path in level]
+        next_level = []
+        for path, result in zip(level, results):
+            if result is None:
+                continue
+            files.append((path, result))
+            if depth == MAX_RC_INCLUDE_DEPTH:
+                continue # Too deep; includes of this level are not followed
+            for argument in result["sources"]:
+                for included in _expand_source(argument):
+                    real_path = os.path.realpath(included)
+                    if real_path not in seen and os.path.isfile(included):
+                        seen.add(real_path)
+                        next_level.append(included)
+        if not next_level:
+            break
+        level = next_level
+    if own_cache:
+        cache.save()
+    return files
+
+
+class Definition(NamedTuple):
+    """One place where an RC file exports a variable."""
+    path: str
+    line: int # 1-based
+    text: str # The line, stripped
+    shell: str = "" # Whose config files it belongs to (multi-shell view only)
+
+
+def build_provenance_index(
+    roots: List[Tuple[str, str]], results: Dict[str, Dict[str, List[str]]]
+) -> Dict[str, List[Definition]]:
+    """
+    name -> every Definition of it, in the order the shell runs them (so the last one
+    wins): each root's lines in order, with a sourced file's definitions at its source/.
+    line. roots are (shell, path) pairs; files are visited once per shell, as in
+    collect_rc_files. results maps absolute paths to parse results (nothing is re-read).
+    """
+    index: Dict[str, List[Definition]] = {}
+    seen: Set[str] = set()
+
+    def visit(path: str, shell: str, depth: int) -> None:
+        result = results.get(os.path.abspath(path))
+        if result is None:
+            return
+        events = [] # (line, order, kind, payload): sources run after an export on the same line
+        for entry in result.get("definitions", []):
+            line, name, text = entry.split("\t", 2)
+            events.append((int(line), 0, name, text))
+        if depth < MAX_RC_INCLUDE_DEPTH:
+            for entry in result.get("includes", []):
+                line, argument = entry.split("\t", 1)
+                events.append((int(line), 1, None, argument))
+        for line, _, name, payload in sorted(events, key=lambda event: event[:2]):
+            if name is not None:
+                index.setdefault(name, []).append(Definition(path, line, payload, shell))
+                continue
+            for included in _expand_source(payload):
+                real_path = os.path.realpath(included)
+                if real_path not in seen and os.path.isfile(included):
+                    seen.add(real_path)
+                    visit(included, shell, depth + 1)
+
+    previous_shell = None
+    for shell, root in roots:
+        if shell != previous_shell:
+            seen = set() # Each shell runs its own files
+            previous_shell = shell
+        real_root = os.path.realpath(root)
+        if real_root not in seen:
+            seen.add(real_root)
+            visit(root, shell, 0)
+    return index
+
+
+def get_shell_rc_candidates() -> List[Tuple[str, str]]:
+    """(shell, path) for every config file of every supported shell, existing or not."""
+    return [
+        (shell, os.path.expanduser(path)) for shell, paths in SHELL_RC_FILES.items() for path in paths
+    ]
+
+
+def get_all_shell_config_files() -> List[Tuple[str, str]]:
+    """(shell, path) for the config files of all supported shells that exist."""
+    return [(shell, path) for shell, path in get_shell_rc_candidates() if os.path.isfile(path)]
+
+
+def collect_shell_rc_files(
+    reuse: Dict[str, Dict[str, List[str]]] | None = None,
+) -> Dict[str, List[Tuple[str, Dict[str, List[str]]]]]:
+    """
+    The config files of all supported shells (SHELL_RC_FILES) and the files they source,
+    as shell -> [(path, parse result)]. Each config file is followed concurrently on a
+    thread pool, sharing one parse cache; see collect_rc_files for reuse.
+    """
+    roots = get_all_shell_config_files()
+    if not roots:
+        return {}
+    cache = rc_cache.RcParseCache(RC_PARSER_VERSION)
+    with ThreadPoolExecutor(max_workers=min(MAX_RC_READ_WORKERS, len(roots))) as pool:
+        collected = list(pool.map(lambda root: collect_rc_files(root[1], reuse, cache), roots))
+    cache.save()
+    per_shell: Dict[str, List[Tuple[str, Dict[str, List[str]]]]] = {}
+    for (shell, _), files in zip(roots, collected):
+        per_shell.setdefault(shell, []).extend(files)
+    return per_shell
+
+
+def get_shell_write_targets(shells: List[str] | None = None) -> List[str]:
+    """
+    The config file that "Update All Shells" writes to for each of shells (default: the
+    shells that have a config file): the first existing one of the shell's files, else
+    its first file (created on write).
+    """
+    existing = get_all_shell_config_files()
+    if shells is None:
+        shells = list(dict.fromkeys(shell for shell, _ in existing))
+    targets = []
+    for shell in shells:
+        paths = [path for candidate_shell, path in existing if candidate_shell == shell]
+        if paths:
+            targets.append(paths[0])
+        elif shell in SHELL_RC_FILES:
+            targets.append(os.path.expanduser(SHELL_RC_FILES[shell][0]))
+        else:
+            print(f"Warning: Unknown shell '{shell}' (known: {', '.join(SHELL_RC_FILES)}). Skipping.")
+    return targets
+
+
+def get_user_defined_vars_from_rc(all_shells: bool = False) -> Set[str]:
+    """
+    Attempts to parse the user's shell config file, and the files it sources, to find
+    exported variables (export, declare -x / typeset -x, or set -gx in fish files).
+    all_shells reads the config files of every supported shell instead.
     Returns a set of variable names found.
     """
-    config_file = get_shell_config_file()
+    if all_shells:
+        rc_files = [item for files in collect_shell_rc_files().values() for item in files]
+    else:
+        rc_files = collect_rc_files()
     user_vars = set()
-    if config_file and Path(config_file).exists():
-        try:
-            content = Path(config_file).read_text()
-            # Regex to find lines starting with optional whitespace, 'export', whitespace,
-            # then capture the variable name (alphanumeric + underscore, not starting with digit),
-            # followed by '='. Handles potential spaces around '='.
-            # Example matches: export VAR=..., export VAR = ..., export   VAR=...
-            # It does NOT match commented lines like # export VAR=...
-            export_pattern = re.compile(r"^\s*export\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=")
-            for line in content.splitlines():
-                match = export_pattern.match(line)
-                if match:
-                    user_vars.add(match.group(1))
-        except Exception as e:
-            # Log or notify about the error if needed, but don't crash
-            print(f"Warning: Could not read or parse {config_file}: {e}")
-            # Optionally notify the user via the notify callback if available/appropriate
-            pass # Silently ignore for now
+    for _, result in rc_files:
+        user_vars.update(result["vars"])
     return user_vars
 
+def _notify_staged(
+    notify: NotifyCallable, action: str, config_files: List[str], pending: rc_transaction.RcTransaction
+) -> None:
+    files = "\n".join(f"[i]{config_file}[/i]" for config_file in config_files)
+    notify(
+        f"{action} internally and TUI updated.\n"
+        f"Staged the change to:\n{files}\n"
+        f"{len(pending)} pending RC change(s); press [b]p[/b] to review and commit. Title: Config Change Staged Severity: information Timeout: 8"
+    )
+
 def save_variable(
     var_name: str,
     new_value: str,
     action_button_id: str,
     is_new: bool,
     all_env_vars: Dict[str, str], # Pass current env vars state
-    notify: NotifyCallable # Pass notify function
+    notify: NotifyCallable, # Pass notify function
+    config_files: List[str] | None = None, # RC files to update (default: the $SHELL one)
+    pending: rc_transaction.RcTransaction | None = None # Staging mode: stage RC edits here instead
 ) -> Tuple[bool, Dict[str, str]]: # Return TUI update status and potentially modified env vars
-    """Handles the common logic for saving/adding a variable based on the button pressed."""
+    """
+    Handles the common logic for saving/adding a variable based on the button pressed.
+    With config_files, Update RC writes to all of them in one go (each in its own syntax).
+    With pending, Update RC only stages the edit; nothing is written until it is committed.
+    """
 
     # Determine action type from button ID
     update_rc = action_button_id in ("edit-save-rc", "add-save-rc")
@@ -88,21 +330,18 @@ def save_variable(
     copy_cmd_only = not update_rc and not launch_terminal
 
     tui_updated = False # Flag to track if internal state changed
-    current_env_vars = all_env_vars.copy() # Work on a copy
+    # Updated in place, no copy; display order comes from the app's sorted key index
+    current_env_vars = all_env_vars
 
     # 1. Update internal dictionary ONLY if updating RC
     if update_rc:
         current_env_vars[var_name] = new_value
         tui_updated = True
-        # Re-sort dictionary after adding if it was a new variable
-        if is_new:
-            current_env_vars = dict(sorted(current_env_vars.items()))
 
     # Steps 2, 3, 4 (updating reactive vars, table, cursor) are handled in the App class
 
-    # 5. Construct export command (always needed)
-    quoted_value = shlex.quote(new_value)
-    export_cmd = f'export {var_name}={quoted_value}'
+    # 5. Construct export command (always needed), in the syntax of the user's shell (fish or POSIX)
+    export_cmd = rc_document.export_command(var_name, new_value, rc_document.shell_syntax())
 
     # 6. Perform copy, RC update, or launch terminal action
     add_or_update = "Added" if is_new else "Updated"
@@ -179,6 +418,7 @@ def save_variable(
         shell_type = "shell"
         tui_msg = "internally (TUI not updated)."
         try:
+            import pyperclip # Imported on first copy; not needed to start up
             pyperclip.copy(export_cmd)
             notify(
                 f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
@@ -193,64 +433,40 @@ def save_variable(
                 f"(Copy failed: {e}). Title: Export Command Copy Failed Timeout: 10 Severity: warning"
             )
     elif update_rc: # Save Update RC (Linux Only)
-        config_file = get_shell_config_file()
-        if config_file:
-            config_path = Path(config_file)
-            config_dir = config_path.parent
-            try:
-                config_dir.mkdir(parents=True, exist_ok=True)
-                lines = []
-                updated_existing_rc = False
-                search_prefix = f"export {var_name}="
-                comment_line = f"\n# Added/Updated by EnvTuiApp"
-
-                if config_path.exists():
-                    lines = config_path.read_text().splitlines()
-
-                new_lines = []
-                found_in_rc = False
-                i = 0
-                while i < len(lines):
-                    line = lines[i]
-                    stripped_line = line.strip()
-                    if stripped_line.startswith(search_prefix):
-                        prev_comment_found = False
-                        for j in range(i - 1, -1, -1):
-                            prev_line = lines[j].strip()
-                            if prev_line == comment_line.strip():
-                                prev_comment_found = True
-                                break
-                            elif prev_line:
-                                break
-                        if not prev_comment_found:
-                            new_lines.append(comment_line.strip())
-                        new_lines.append(export_cmd)
-                        found_in_rc = True
-                        updated_existing_rc = True
-                        i += 1
-                        continue
-                    new_lines.append(line)
-                    i += 1
-
-                if not found_in_rc:
-                    if new_lines and new_lines[-1]:
-                        new_lines.append("")
-                    new_lines.append(comment_line.strip())
-                    new_lines.append(export_cmd)
-
-                config_path.write_text("\n".join(new_lines) + "\n")
-                action_desc = "Updated existing export" if updated_existing_rc else "Appended export command"
+        if config_files is None:
+            config_file = get_shell_config_file()
+            config_files = [config_file] if config_file else []
+        if config_files and pending is not None:
+            for config_file in config_files:
+                pending.set_export(config_file, var_name, new_value)
+            _notify_staged(notify, f"{action_verb} [b]{var_name}[/b]", config_files, pending)
+        elif config_files:
+            updated, failed = [], []
+            for config_file in config_files:
+                try:
+                    Path(config_file).parent.mkdir(parents=True, exist_ok=True)
+                    # Parsed once and kept in memory; only the affected lines change
+                    document = rc_document.load_document(config_file)
+                    updated_existing_rc = document.set_export(var_name, new_value) # Written in the file's syntax
+                    rc_document.save_document(config_file, document)
+                    action_desc = "Updated existing export" if updated_existing_rc else "Appended export command"
+                    updated.append(f"{action_desc} in:\n[i]{config_file}[/i]")
+                except Exception as e:
+                    rc_document.forget_document(config_file) # May be partly edited
+                    failed.append(f"Failed to write to config file [i]{config_file}[/i]:\n{e}")
+            if not failed:
                 tui_msg = "internally and TUI updated."
                 notify(
                     f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
-                    f"{action_desc} in:\n[i]{config_file}[/i]\n"
+                    + "\n".join(updated) + "\n"
                     f"[b]Note:[/b] This change will only apply to [u]new[/u] shell sessions. Title: Config File Updated (Persistent) Timeout: 12"
                 )
-            except Exception as e:
+            else:
                 tui_msg = "internally and TUI updated, but"
                 notify(
                     f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
-                    f"Failed to write to config file [i]{config_file}[/i]:\n{e}. Title: Config Update Error Severity: error Timeout: 12"
+                    + "\n".join(failed + updated)
+                    + ". Title: Config Update Error Severity: error Timeout: 12"
                 )
         else:
             tui_msg = "internally and TUI updated, but"
@@ -267,9 +483,15 @@ def delete_variable(
     var_name: str,
     action_button_id: str,
     all_env_vars: Dict[str, str], # Pass current env vars state
-    notify: NotifyCallable # Pass notify function
+    notify: NotifyCallable, # Pass notify function
+    config_files: List[str] | None = None, # RC files to update (default: the $SHELL one)
+    pending: rc_transaction.RcTransaction | None = None # Staging mode: stage RC edits here instead
 ) -> Tuple[bool, Dict[str, str]]: # Return TUI update status and potentially modified env vars
-    """Handles the common logic for deleting a variable based on the button pressed."""
+    """
+    Handles the common logic for deleting a variable based on the button pressed.
+    With config_files, Update RC removes the export from all of them in one go.
+    With pending, Update RC only stages the removal; nothing is written until it is committed.
+    """
     if var_name not in all_env_vars:
         notify(f"Variable '{var_name}' not found for deletion. Severity: error")
         return False, all_env_vars # No change
@@ -280,7 +502,7 @@ def delete_variable(
     copy_cmd_only = not update_rc and not launch_terminal
 
     tui_updated = False # Flag to track if internal state changed
-    current_env_vars = all_env_vars.copy() # Work on a copy
+    current_env_vars = all_env_vars # Updated in place, no copy
 
     # 1. Remove from internal dictionary ONLY if updating RC
     if update_rc:
@@ -290,7 +512,7 @@ def delete_variable(
     # Steps 2, 3 (updating reactive vars, table) are handled in the App class
 
     # 4. Construct unset command (always needed for actions)
-    unset_cmd = f'unset {var_name}'
+    unset_cmd = rc_document.unset_command(var_name, rc_document.shell_syntax())
 
     # 5. Perform copy or RC update action
     action_verb = "Deleted" if tui_updated else "Prepared delete action for"
@@ -299,6 +521,7 @@ def delete_variable(
         shell_type = "shell"
         tui_msg = "internally (TUI not updated)."
         try:
+            import pyperclip # Imported on first copy; not needed to start up
             pyperclip.copy(unset_cmd)
             notify(
                 f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
@@ -313,60 +536,49 @@ def delete_variable(
                 f"(Copy failed: {e}). Title: Unset Command Copy Failed Timeout: 10 Severity: warning"
             )
     elif update_rc: # Delete Update RC (Linux Only)
-        config_file = get_shell_config_file()
-        if config_file:
-            config_path = Path(config_file)
-            config_dir = config_path.parent
-            try:
-                config_dir.mkdir(parents=True, exist_ok=True)
-                tui_msg = "internally and TUI updated." # TUI is updated in this branch
-                if not config_path.exists():
-                    notify(
-                        f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
-                        f"Config file [i]{config_file}[/i] does not exist. Cannot remove variable. Title: Config Update Info Severity: info Timeout: 10"
-                    )
-                    return tui_updated, current_env_vars # Return updated state
-
-                lines = config_path.read_text().splitlines()
-                new_lines = []
-                found_and_removed = False
-                search_prefix = f"export {var_name}="
-                comment_prefix = f"# Added/Updated by EnvTuiApp"
-
-                i = 0
-                while i < len(lines):
-                    line = lines[i]
-                    stripped_line = line.strip()
-                    if stripped_line.startswith(search_prefix):
-                        if i > 0 and lines[i-1].strip() == comment_prefix:
-                            if new_lines and new_lines[-1].strip() == comment_prefix:
-                                new_lines.pop()
-                                if new_lines and not new_lines[-1].strip():
-                                    new_lines.pop()
-                        found_and_removed = True
-                        i += 1
-                        continue
-                    new_lines.append(line)
-                    i += 1
-
-                if found_and_removed:
-                    config_path.write_text("\n".join(new_lines) + "\n")
-                    notify(
-                        f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
-                        f"Removed export command from:\n[i]{config_file}[/i]\n"
-                        f"[b]Note:[/b] This change will only apply to [u]new[/u] shell sessions. Title: Config File Updated (Persistent) Timeout: 12"
-                    )
-                else:
-                    notify(
-                        f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
-                        f"Variable export not found in [i]{config_file}[/i]. No changes made to file. Title: Config Update Info Severity: info Timeout: 10"
-                    )
-
-            except Exception as e:
+        if config_files is None:
+            config_file = get_shell_config_file()
+            config_files = [config_file] if config_file else []
+        existing_files = [config_file for config_file in config_files if Path(config_file).exists()]
+        if existing_files and pending is not None:
+            for config_file in existing_files:
+                pending.remove_export(config_file, var_name)
+            _notify_staged(notify, f"{action_verb} [b]{var_name}[/b]", existing_files, pending)
+        elif config_files:
+            tui_msg = "internally and TUI updated." # TUI is updated in this branch
+            removed, not_found, failed = [], [], []
+            for config_file in config_files:
+                if not Path(config_file).exists():
+                    not_found.append(f"Config file [i]{config_file}[/i] does not exist. Cannot remove variable.")
+                    continue
+                try:
+                    document = rc_document.load_document(config_file)
+                    if document.remove_export(var_name):
+                        rc_document.save_document(config_file, document)
+                        removed.append(f"[i]{config_file}[/i]")
+                    else:
+                        not_found.append(f"Variable export not found in [i]{config_file}[/i]. No changes made to file.")
+                except Exception as e:
+                    rc_document.forget_document(config_file) # May be partly edited
+                    failed.append(f"Failed to update config file [i]{config_file}[/i]:\n{e}")
+
+            if failed:
                 tui_msg = "internally and TUI updated, but"
                 notify(
                     f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
-                    f"Failed to update config file [i]{config_file}[/i]:\n{e}. Title: Config Update Error Severity: error Timeout: 12"
+                    + "\n".join(failed + ([f"Removed export command from:\n" + "\n".join(removed)] if removed else []))
+                    + ". Title: Config Update Error Severity: error Timeout: 12"
+                )
+            elif removed:
+                notify(
+                    f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
+                    f"Removed export command from:\n" + "\n".join(removed) + "\n"
+                    f"[b]Note:[/b] This change will only apply to [u]new[/u] shell sessions. Title: Config File Updated (Persistent) Timeout: 12"
+                )
+            else:
+                notify(
+                    f"{action_verb} [b]{var_name}[/b] {tui_msg}\n"
+                    + "\n".join(not_found) + " Title: Config Update Info Severity: info Timeout: 10"
                 )
         else:
             tui_msg = "internally and TUI updated, but"
@@ -0,0 +1,141 @@
+import builtins
+import functools
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+SLOWEST_IMPORTS_SHOWN = 15 # Imports listed in the text report (the JSON has all of them)
+
+
+class StartupProfiler:
+    """
+    Times the startup phases of the app (see phase()) and, while import timing is
+    on, every first-time import. Import times are like `python -X importtime`:
+    'self' excludes the time spent in nested imports, 'cumulative' includes it.
+    """
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = [] # (phase, seconds) in the order they ran
+        self._ready_at: float | None = None # Seconds from start until the table was first filled
+        self._imports: Dict[str, Tuple[float, float]] = {} # module -> (self, cumulative) seconds
+        self._import_stack: List[float] = [] # Time spent in nested imports, per open import
+        self._original_import = None
+
+    # --- Phases ---
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as phase name (only its first run is recorded)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if all(recorded != name for recorded, _ in self._phases):
+                self._phases.append((name, time.perf_counter() - started))
+
+    def mark_ready(self) -> None:
+        """The app is usable: records the time since the profiler was created (first call only)."""
+        if self._ready_at is None:
+            self._ready_at = time.perf_counter() - self._started
+
+    # --- Imports ---
+
+    def start_import_timing(self) -> None:
+        """Times every module imported for the first time until stop_import_timing()."""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def stop_import_timing(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules: # Relative or already loaded: nothing to time
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._import_stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - started
+            nested = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += cumulative
+            self._imports.setdefault(name, (cumulative - nested, cumulative))
+
+    # --- Reporting ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Machine-readable breakdown (all times in milliseconds)."""
+        slowest = sorted(self._imports.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "ready_ms": None if self._ready_at is None else round(self._ready_at * 1000, 3),
+            "phases": [
+                {"phase": name, "ms": round(seconds * 1000, 3)} for name, seconds in self._phases
+            ],
+            "imports": [
+                {"module": module, "self_ms": round(own * 1000, 3), "cumulative_ms": round(cumulative * 1000, 3)}
+                for module, (own, cumulative) in slowest
+            ],
+        }
+
+    def report(self) -> str:
+        """Human-readable breakdown: phases in order, then the slowest imports."""
+        data = self.to_dict()
+        lines = ["Startup profile (ms):"]
+        for entry in data["phases"]:
+            lines.append(f"  {entry['ms']:10.1f}  {entry['phase']}")
+        if data["ready_ms"] is not None:
+            lines.append(f"  {data['ready_ms']:10.1f}  until the table was first shown")
+        lines.append(f"Slowest imports (self / cumulative ms, {len(data['imports'])} modules imported):")
+        for entry in data["imports"][:SLOWEST_IMPORTS_SHOWN]:
+            lines.append(f"  {entry['self_ms']:10.1f} {entry['cumulative_ms']:10.1f}  {entry['module']}")
+        return "\n".join(lines)
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+
+# The active profiler, if startup profiling was requested (see enable())
+active: StartupProfiler | None = None
+
+
+def enable() -> StartupProfiler:
+    """Turns startup profiling on (idempotent) and returns the profiler."""
+    global active
+    if active is None:
+        active = StartupProfiler()
+    return active
+
+
+def phase(name: str):
+    """Context manager timing a startup phase; does nothing unless profiling is enabled."""
+    return active.phase(name) if active is not None else nullcontext()
+
+
+def timed_phase(name: str, marks_ready: bool = False) -> Callable:
+    """
+    Decorator timing the first call of a function as phase name (e.g. the first
+    update_table, whoever triggers it). marks_ready also records the time until then.
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return function(*args, **kwargs)
+            try:
+                with active.phase(name):
+                    return function(*args, **kwargs)
+            finally:
+                if marks_ready:
+                    active.mark_ready()
+        return wrapper
+    return decorator
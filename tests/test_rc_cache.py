@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+import rc_cache
+import shell_utils
+
+RESULT = {"vars": ["A"], "sources": []}
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    """Points the cache at a temporary file; files written by the test are cacheable at once."""
+    path = tmp_path / "config" / rc_cache.RC_CACHE_FILE_NAME
+    monkeypatch.setattr(rc_cache, "get_cache_path", lambda: path)
+    monkeypatch.setattr(rc_cache, "RACY_MTIME_SECONDS", 0.0)
+    return path
+
+
+def write(path, content: str):
+    path.write_text(content)
+    return str(path)
+
+
+# --- RcParseCache ---
+
+def test_saved_entry_is_found_for_the_same_file_version(tmp_path, cache_path):
+    path = write(tmp_path / "bashrc", "export A=1\n")
+    cache = rc_cache.RcParseCache(parser_version=1)
+    cache.put(path, os.stat(path), RESULT)
+    cache.save()
+    assert rc_cache.RcParseCache(parser_version=1).get(path, os.stat(path)) == RESULT
+
+
+def test_editing_the_file_invalidates_its_entry(tmp_path, cache_path):
+    path = write(tmp_path / "bashrc", "export A=1\n")
+    cache = rc_cache.RcParseCache(parser_version=1)
+    cache.put(path, os.stat(path), RESULT)
+    write(tmp_path / "bashrc", "export A=1 B=2\n")
+    assert cache.get(path, os.stat(path)) is None
+
+
+def test_another_parser_or_format_version_drops_the_cache(tmp_path, cache_path):
+    path = write(tmp_path / "bashrc", "export A=1\n")
+    cache = rc_cache.RcParseCache(parser_version=1)
+    cache.put(path, os.stat(path), RESULT)
+    cache.save()
+    assert rc_cache.RcParseCache(parser_version=2).get(path, os.stat(path)) is None
+    data = json.loads(cache_path.read_text())
+    cache_path.write_text(json.dumps({**data, "format": rc_cache.RC_CACHE_FORMAT + 1}))
+    assert rc_cache.RcParseCache(parser_version=1).get(path, os.stat(path)) is None
+
+
+def test_malformed_cache_is_a_miss(tmp_path, cache_path):
+    path = write(tmp_path / "bashrc", "export A=1\n")
+    cache_path.parent.mkdir(parents=True)
+    cache_path.write_text("{not json")
+    assert rc_cache.RcParseCache(parser_version=1).get(path, os.stat(path)) is None
+    cache_path.write_text(json.dumps({
+        "format": rc_cache.RC_CACHE_FORMAT, "parser": 1,
+        "entries": {path: {"key": rc_cache.file_key(os.stat(path)), "result": {"vars": [1]}}},
+    }))
+    assert rc_cache.RcParseCache(parser_version=1).get(path, os.stat(path)) is None
+
+
+def test_just_modified_files_are_not_cached(tmp_path, cache_path, monkeypatch):
+    monkeypatch.setattr(rc_cache, "RACY_MTIME_SECONDS", 60.0)
+    path = write(tmp_path / "bashrc", "export A=1\n")
+    cache = rc_cache.RcParseCache(parser_version=1)
+    cache.put(path, os.stat(path), RESULT)
+    assert cache.get(path, os.stat(path)) is None
+    cache.save()
+    assert not cache_path.exists() # Nothing changed, nothing written
+
+
+# --- collect_rc_files ---
+
+def test_collect_rc_files_follows_includes_and_stops_at_cycles(tmp_path, cache_path):
+    a = tmp_path / "a.sh"
+    b = tmp_path / "b.sh"
+    root = write(tmp_path / "bashrc", f"export ROOT=1\nsource {a}\n. {b}\n")
+    write(a, f"export A=1\nsource {tmp_path / 'bashrc'}\n") # Cycle back to the root
+    write(b, f"export B=1\nsource {a}\nsource {tmp_path / 'missing.sh'}\n")
+    files = shell_utils.collect_rc_files(root, cache=rc_cache.RcParseCache(shell_utils.RC_PARSER_VERSION))
+    assert [(os.path.basename(path), result["vars"]) for path, result in files] == [
+        ("bashrc", ["ROOT"]), ("a.sh", ["A"]), ("b.sh", ["B"]),
+    ]
+
+
+def test_collect_rc_files_stops_at_the_include_depth_limit(tmp_path, cache_path):
+    count = shell_utils.MAX_RC_INCLUDE_DEPTH + 3
+    paths = [tmp_path / f"level{i}.sh" for i in range(count)]
+    for i, path in enumerate(paths):
+        write(path, f"export LEVEL{i}=1\n" + (f"source {paths[i + 1]}\n" if i + 1 < count else ""))
+    files = shell_utils.collect_rc_files(str(paths[0]), cache=rc_cache.RcParseCache(shell_utils.RC_PARSER_VERSION))
+    assert len(files) == shell_utils.MAX_RC_INCLUDE_DEPTH + 1
+    assert files[-1][0] == str(paths[shell_utils.MAX_RC_INCLUDE_DEPTH])
+
+
+def test_collect_rc_files_uses_reused_results_without_reading(tmp_path, cache_path):
+    root = write(tmp_path / "bashrc", "export ROOT=1\n")
+    reused = {"vars": ["FROM_WATCHER"], "sources": []}
+    files = shell_utils.collect_rc_files(
+        root, reuse={root: reused}, cache=rc_cache.RcParseCache(shell_utils.RC_PARSER_VERSION)
+    )
+    assert files == [(root, reused)]
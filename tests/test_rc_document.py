@@ -0,0 +1,167 @@
+from rc_document import FISH, MANAGED_COMMENT, RcDocument, parse_line
+
+
+def edited(content: str, syntax: str = "posix", *, set_to=None, remove=None) -> str:
+    """content after set_export(*set_to) and/or remove_export(remove), serialized."""
+    document = RcDocument.parse(content, syntax)
+    if set_to is not None:
+        document.set_export(*set_to)
+    if remove is not None:
+        document.remove_export(remove)
+    return document.serialize()
+
+
+def exported(line: str, syntax: str = "posix"):
+    """Names parse_line finds exported on line, in order."""
+    return [name for name, _ in parse_line(line, syntax)[0]]
+
+
+# --- parse_line ---
+
+def test_parse_line_multi_assign():
+    line = "export A=1 B='x y' C"
+    exports, sources = parse_line(line)
+    assert [name for name, _ in exports] == ["A", "B", "C"]
+    assert sources == []
+    assert [line[slice(*export.region)] for _, export in exports] == ["A=1", "B='x y'", "C"]
+    assert not any(export.sole for _, export in exports)
+    assert all(export.whole_line and export.command == (0, len(line)) for _, export in exports)
+
+
+def test_parse_line_declare_and_typeset():
+    assert exported("declare -x D=1") == ["D"]
+    assert exported("typeset -x T") == ["T"]
+    assert exported("declare -rx R=1") == ["R"]
+    assert exported("declare -a ARR=(1 2)") == [] # Not exported
+    assert exported("typeset +x A") == []
+    assert exported("export -n A") == [] # Un-exports
+    assert exported("export -p") == []
+
+
+def test_parse_line_exported_functions_are_not_variables():
+    assert exported("export -f myfn") == []
+    assert exported("declare -fx myfn") == []
+    assert exported("declare -f -x myfn") == []
+    assert exported("typeset -fx myfn") == []
+    assert exported("typeset -Fx myfn") == []
+
+
+def test_parse_line_in_block():
+    line = "if [ -d /x ]; then export P=/x; fi"
+    [(name, export)] = parse_line(line)[0]
+    assert name == "P"
+    assert export.in_block and export.sole and not export.whole_line
+    assert line[slice(*export.command)] == "export P=/x" # Without the 'then'
+
+
+def test_parse_line_sources():
+    assert parse_line("source ~/.bashrc.d/a.sh && . ./b.sh") == ([], ["~/.bashrc.d/a.sh", "./b.sh"])
+
+
+def test_parse_line_fish_set():
+    line = "set -gx P /a /b"
+    [(name, export)] = parse_line(line, FISH)[0]
+    assert name == "P"
+    assert line[slice(*export.region)] == "P /a /b"
+    assert exported("set -Ux U 1", FISH) == ["U"]
+    assert exported("set --global --export G 1", FISH) == ["G"]
+    assert exported("set -g NOEXP 1", FISH) == []
+    assert exported("set -e P", FISH) == []
+    assert exported("export E=1", FISH) == ["E"]
+
+
+def test_parse_line_fish_local_and_function_scope_are_not_exported():
+    assert exported("set -l -x A 1", FISH) == []
+    assert exported("set -lx A 1", FISH) == []
+    assert exported("set --local --export A 1", FISH) == []
+    assert exported("set -f -x A 1", FISH) == []
+    assert exported("set --function -x A 1", FISH) == []
+
+
+# --- set_export / remove_export round-trips ---
+
+def test_set_export_rewrites_only_that_variable_of_a_multi_assign():
+    content = "# head\nexport A=1 B='two words' C=3\nalias ll='ls -l'\n"
+    assert edited(content, set_to=("B", "new val")) == (
+        f"# head\n{MANAGED_COMMENT}\nexport A=1 B='new val' C=3\nalias ll='ls -l'\n"
+    )
+
+
+def test_set_export_keeps_declare_and_block_forms():
+    assert edited("declare -x D=\"q\"\nfoo\n", set_to=("D", "z")) == f"{MANAGED_COMMENT}\ndeclare -x D=z\nfoo\n"
+    assert edited("if true; then export A=1; fi\n", set_to=("A", "x y")) == (
+        f"{MANAGED_COMMENT}\nif true; then export A='x y'; fi\n"
+    )
+
+
+def test_set_export_in_fish_keeps_the_set_form():
+    content = "set -gx P /a /b\nset -l L 1\n"
+    assert edited(content, FISH, set_to=("P", "/c")) == f"{MANAGED_COMMENT}\nset -gx P /c\nset -l L 1\n"
+    assert edited("export E=1\n", FISH, set_to=("E", "2 3")) == f"{MANAGED_COMMENT}\nexport E='2 3'\n"
+
+
+def test_set_export_twice_adds_the_managed_comment_once():
+    once = edited("export A=1 B=2\n", set_to=("B", "3"))
+    assert edited(once, set_to=("B", "4")) == f"{MANAGED_COMMENT}\nexport A=1 B=4\n"
+
+
+def test_remove_export_keeps_the_other_variables_and_commands():
+    content = "# head\nexport A=1 B='two words' C=3\nalias ll='ls -l'\n"
+    assert edited(content, remove="B") == "# head\nexport A=1 C=3\nalias ll='ls -l'\n"
+    assert edited("cd ~ && export A=1; echo hi\n", remove="A") == "cd ~ && echo hi\n"
+    assert edited("if true; then export A=1; fi\n", remove="A") == "if true; then :; fi\n"
+    assert edited("set -gx P /a /b\nset -l L 1\n", FISH, remove="P") == "set -l L 1\n"
+
+
+def test_added_export_is_removed_with_its_comment_and_blank_line():
+    content = "export A=1\n"
+    added = edited(content, set_to=("N", "v"))
+    assert added == f"export A=1\n\n{MANAGED_COMMENT}\nexport N=v\n"
+    assert edited(added, remove="N") == content
+    # Also within the same document, before it is written and parsed again
+    assert edited(content, set_to=("N", "v"), remove="N") == content
+
+
+def test_remove_export_of_a_missing_name_changes_nothing():
+    document = RcDocument.parse("x=1\nexport A=1\n")
+    assert document.remove_export("B") is False
+    assert document.serialize() == "x=1\nexport A=1\n"
+
+
+# --- Quoted values spanning several lines ---
+
+def test_multi_line_value_is_one_entry():
+    document = RcDocument.parse("a=1\nexport N='multi\nline' M=2\nexport B=2\n")
+    assert document.exports == {"N": [1], "M": [1], "B": [2]}
+    assert document.definitions() == [(2, "N", "export N='multi"), (2, "M", "export N='multi"), (4, "B", "export B=2")]
+    # An unterminated quote that never closes does not swallow the rest of the file
+    assert RcDocument.parse("export A='x\nexport B=2\n").exports == {"A": [0], "B": [1]}
+
+
+def test_set_export_with_a_newline_keeps_tracking_the_variable():
+    document = RcDocument.parse("export A=1\n")
+    document.set_export("N", "one\ntwo")
+    assert document.exports["N"] == [3]
+    assert document.set_export("N", "three") is True # Updated, not appended again
+    assert document.serialize() == f"export A=1\n\n{MANAGED_COMMENT}\nexport N=three\n"
+
+
+def test_multi_line_value_is_rewritten_and_removed_as_a_whole():
+    content = "export N='multi\nline'\nexport B=2\n"
+    assert edited(content, set_to=("N", "x")) == f"{MANAGED_COMMENT}\nexport N=x\nexport B=2\n"
+    assert edited(content, remove="N") == "export B=2\n"
+    written = edited("", set_to=("N", "a\nb"))
+    assert written == f"{MANAGED_COMMENT}\nexport N='a\nb'\n"
+    assert RcDocument.parse(written).exports == {"N": [1]}
+    assert edited("set -gx N 'it\\'s\nhere'\nset -gx X 1\n", FISH, remove="N") == "set -gx X 1\n"
+
+
+def test_a_name_exported_twice_on_one_line_is_edited_everywhere():
+    content = "export A=1; export A=2\nexport B=1\n"
+    assert RcDocument.parse(content).occurrences[(0, "A")][1].region == (19, 22)
+    assert edited(content, set_to=("A", "x")) == f"{MANAGED_COMMENT}\nexport A=x; export A=x\nexport B=1\n"
+    assert edited(content, remove="A") == "export B=1\n"
+    assert edited("export A=1 B=2; echo hi; export A=3\n", remove="A") == "export B=2; echo hi\n"
+    assert edited("set -gx A 1; export A=2\n", FISH, set_to=("A", "x y")) == (
+        f"{MANAGED_COMMENT}\nset -gx A 'x y'; export A='x y'\n"
+    )
@@ -0,0 +1,80 @@
+import codecs
+import locale
+
+import pytest
+
+import rc_document
+import rc_scanner
+
+pytestmark = pytest.mark.skipif(
+    codecs.lookup(locale.getpreferredencoding(False)).name not in ("utf-8", "ascii"),
+    reason="scan_file only handles UTF-8/ASCII locales",
+)
+
+
+def assert_parity(path, syntax=rc_document.POSIX):
+    """scan_file finds exactly what a full RcDocument parse of the file finds."""
+    document = rc_document.RcDocument.parse(path.read_text(), syntax)
+    scanned = rc_scanner.scan_file(str(path), syntax)
+    assert scanned is not None
+    assert scanned.definitions == document.definitions()
+    assert scanned.source_lines == document.source_lines()
+    return scanned
+
+
+def test_scan_file_matches_full_parse_on_a_generated_profile(tmp_path):
+    path = tmp_path / "profile.sh"
+    path.write_text(rc_scanner._synthetic_rc(2000))
+    scanned = assert_parity(path)
+    assert len(scanned.definitions) == 200 # Two exports per 20-line block
+    assert scanned.source_lines
+
+
+def test_scan_file_matches_full_parse_on_mixed_lines(tmp_path):
+    path = tmp_path / "bashrc"
+    path.write_text(
+        "# export COMMENTED=1\n"
+        "export A=1 B='two words'\n"
+        "echo 'export NOT_A_COMMAND=1'\n"
+        "declare -x D=1; typeset -a ARR\n"
+        "export -f myfn\n"
+        "if [ -r ~/.extra ]; then . ~/.extra; fi\n"
+        "source ~/.aliases\n"
+        "PATH=/opt/bin:$PATH export PATH\n"
+        "export LAST=end" # No final newline
+    )
+    assert_parity(path)
+
+
+def test_scan_file_matches_full_parse_on_utf8_text(tmp_path):
+    path = tmp_path / "bashrc"
+    path.write_text("# Grüße\nexport GREETING='héllo wörld'\nexport NEXT=1\n", encoding="utf-8")
+    assert_parity(path)
+
+
+def test_scan_file_matches_full_parse_on_fish(tmp_path):
+    path = tmp_path / "config.fish"
+    path.write_text(
+        "set -gx EDITOR vim\n"
+        "set -l LOCAL 1\n"
+        "set -Ux PATHS /a /b\n"
+        "export E=1\n"
+        "source ~/.config/fish/extra.fish\n"
+    )
+    assert_parity(path, rc_document.FISH)
+
+
+def test_scan_file_empty_and_other_line_breaks(tmp_path):
+    empty = tmp_path / "empty"
+    empty.write_text("")
+    assert rc_scanner.scan_file(str(empty)) == rc_scanner.ScanResult([], [])
+    crlf = tmp_path / "crlf"
+    crlf.write_bytes(b"export A=1\r\nexport B=2\r\n")
+    assert rc_scanner.scan_file(str(crlf)) is None # Parsed in full instead
+
+
+def test_scan_file_matches_full_parse_on_multi_line_values(tmp_path):
+    path = tmp_path / "bashrc"
+    path.write_text("export N='multi\nline' M=2\nexport B=\"a\nb\"\nexport LAST=1\n")
+    scanned = assert_parity(path)
+    assert [(number, name) for number, name, _ in scanned.definitions] == [(1, "N"), (1, "M"), (3, "B"), (5, "LAST")]
@@ -0,0 +1,153 @@
+import pytest
+import regex
+
+from search_engine import ResultCache, SearchEngine, TrigramIndex
+
+ENV = {
+    "PATH": "/usr/local/bin:/usr/bin",
+    "PAGER": "less",
+    "HOME": "/home/me",
+    "EDITOR": "vim",
+    "XDG_DATA_DIRS": "/usr/share:/usr/local/share",
+    "LANG": "en_US.UTF-8",
+    "SPLIT": "abc bcd", # Has every trigram of 'abcd', but not 'abcd' itself
+}
+
+
+def engine_with(env=ENV, use_index=False) -> SearchEngine:
+    engine = SearchEngine(use_index=use_index)
+    engine.load(env)
+    return engine
+
+
+def expected(query: str, env=ENV):
+    """What a plain scan finds: sorted names whose name or value contains query (any case)."""
+    query = query.lower()
+    return sorted(name for name, value in env.items() if query in name.lower() or query in value.lower())
+
+
+def history(engine: SearchEngine):
+    return [query for query, _, _ in engine._history]
+
+
+# --- Substring search ---
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_search_matches_a_plain_scan(use_index):
+    engine = engine_with(use_index=use_index)
+    for query in ("", "p", "pa", "pat", "path", "USR", "/usr/local", "share", "abcd", "bcd", "zzz"):
+        assert engine.search(query) == (expected(query) if query else sorted(ENV)), query
+
+
+def test_typing_narrows_the_previous_result_and_backspace_reuses_it():
+    engine = engine_with()
+    wide = engine.search("p")
+    engine.search("pa")
+    engine.search("pat")
+    assert history(engine) == ["p", "pa", "pat"]
+    assert engine.search("p") is wide # Popped back to the cached result
+    assert history(engine) == ["p"]
+    engine.search("h") # Unrelated query starts a new chain
+    assert history(engine) == ["h"]
+
+
+def test_search_returns_spans_of_the_first_match():
+    names, spans = engine_with().search_with_spans("usr")
+    assert names == ["PATH", "XDG_DATA_DIRS"]
+    assert spans["PATH"] == (None, (1, 4))
+    names, spans = engine_with().search_with_spans("ed")
+    assert spans["EDITOR"] == ((0, 2), None)
+
+
+def test_spans_point_into_the_original_text_when_lowercasing_changes_its_length():
+    engine = engine_with({"CITY": "İstanbul match"})
+    assert engine.search_with_spans("match")[1]["CITY"] == (None, (9, 14))
+    assert engine.regex_search("mat.h")[3]["CITY"] == (None, (9, 14))
+    engine.set("CITY", "plain match")
+    assert engine.search_with_spans("match")[1]["CITY"] == (None, (6, 11))
+
+
+def test_cancelled_search_returns_none_and_caches_nothing():
+    engine = engine_with()
+    assert engine.search("p", is_cancelled=lambda: True) is None
+    assert history(engine) == []
+
+
+# --- Trigram index ---
+
+def test_trigram_candidates_are_verified():
+    index = TrigramIndex()
+    index.add("SPLIT", "split", "abc bcd")
+    assert index.candidates("abcd") == {"SPLIT"} # Shares every trigram...
+    assert engine_with(use_index=True).search("abcd") == [] # ...but is not a match
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_set_and_remove_keep_the_indexes_current(use_index):
+    env = dict(ENV)
+    engine = engine_with(env, use_index=use_index)
+    engine.search("less") # Builds the trigram index
+    engine.set("NEW", "needle")
+    env["NEW"] = "needle"
+    engine.set("PAGER", "more")
+    env["PAGER"] = "more"
+    for query in ("needle", "less", "more", "new"):
+        assert engine.search(query) == expected(query, env), query
+    engine.remove("NEW")
+    assert engine.search("needle") == []
+    assert engine.component_search("/usr/bin")[0] == ["PATH"]
+    engine.remove("PATH")
+    assert engine.component_search("/usr/bin")[0] == []
+
+
+def test_update_during_a_search_is_not_cached_and_does_not_fail():
+    env = {f"VAR{i}": "hello" if i == 0 else f"value {i}" for i in range(11)}
+    engine = engine_with(env, use_index=True)
+    engine.search("val") # Builds the trigram index
+    index_candidates = engine._index_candidates
+
+    def add_variable_first(search, version):
+        engine.set("C", "hello again") # As if the UI thread added it after the search started
+        return index_candidates(search, version)
+
+    engine._index_candidates = add_variable_first
+    assert engine.search("hell") == ["VAR0"] # Searched the names it started with
+    assert history(engine) == [] # Overlapped an update, so not cached
+    engine._index_candidates = index_candidates
+    assert engine.search("hell") == ["C", "VAR0"]
+
+
+# --- Other modes ---
+
+def test_fuzzy_search_ranks_name_matches_first_and_limits():
+    engine = engine_with()
+    assert engine.fuzzy_search("pth", limit=10)[0] == "PATH"
+    assert len(engine.fuzzy_search("e", limit=2)) == 2
+    assert engine.fuzzy_search("e", limit=10, include=lambda name: name == "HOME") == ["HOME"]
+
+
+def test_regex_search():
+    names, scanned, budget_hit, spans = engine_with().regex_search(r"^/usr/(local|share)")
+    assert names == ["PATH", "XDG_DATA_DIRS"]
+    assert scanned == len(ENV) and not budget_hit
+    assert spans["XDG_DATA_DIRS"] == (None, (0, 10))
+    with pytest.raises(regex.error):
+        engine_with().regex_search("(")
+
+
+def test_regex_search_stops_at_its_time_budget():
+    names, scanned, budget_hit, _ = engine_with().regex_search("x", budget=0)
+    assert (names, scanned, budget_hit) == ([], 0, True)
+
+
+# --- ResultCache ---
+
+def test_result_cache_evicts_the_least_recently_used_entry():
+    cache = ResultCache(maxsize=2)
+    cache.put(("all", "substring", "a", 1), ["A"])
+    cache.put(("all", "substring", "b", 1), ["B"])
+    assert cache.get(("all", "substring", "a", 1)) == ["A"] # Now the most recently used
+    cache.put(("user", "substring", "a", 1), ["A"])
+    assert cache.get(("all", "substring", "b", 1)) is None
+    assert cache.get(("all", "substring", "a", 1)) == ["A"]
+    assert cache.get(("all", "substring", "a", 2)) is None # Another store version is another key
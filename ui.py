@@ -1,9 +1,13 @@
 from textual.app import ComposeResult
 from textual.containers import Container, ScrollableContainer, Horizontal, Vertical
 from textual.widgets import Header, Footer, DataTable, Input, Static, Button, Label, Rule, TextArea # Added Rule, TextArea
+from virtual_table import VirtualEnvTable # Row-virtualized table for large environments
 
-def compose_app() -> ComposeResult:
-    """Create child widgets for the app."""
+def compose_app(virtual_table: bool = False, all_shells: bool = False) -> ComposeResult:
+    """
+    Create child widgets for the app. virtual_table swaps in the row-virtualized table;
+    all_shells (multi-shell view) adds the "Update All Shells" buttons.
+    """
     print("DEBUG: compose_app() called") # Changed from compose()
     yield Header() # Header provides F1 toggle by default
     yield Input(placeholder="Search variables (name or value)...", id="search-input")
@@ -12,12 +16,20 @@ def compose_app() -> ComposeResult:
             # Filter Status Label
             yield Static("<all>", id="filter-status-label") # Add filter status display
             # Combined Environment Variables Table
-            yield DataTable(id="combined-env-table") # Single table for all variables
+            if virtual_table:
+                # Only renders the rows in view; used for very large environments
+                yield VirtualEnvTable(id="combined-env-table")
+            else:
+                yield DataTable(id="combined-env-table") # Single table for all variables
         with Vertical(id="right-pane"): # Use Vertical for right pane content
             yield Label("Select a variable", id="detail-name")
             # Container for viewing the value
             with ScrollableContainer(id="view-value-container"):
                 yield Static("", id="detail-value", expand=True)
+                # Numbered components of PATH-like variables (hidden for other variables)
+                yield Static("", id="detail-components", classes="hidden")
+                # Where the RC files define the variable (hidden for variables they do not define)
+                yield Static("", id="detail-provenance", classes="hidden")
             # Container for editing the value (initially hidden)
             with Vertical(id="edit-value-container", classes="hidden"):
                 yield Label("Editing:", id="edit-label") # Label for clarity
@@ -26,6 +38,8 @@ def compose_app() -> ComposeResult:
                 with Horizontal(id="edit-buttons"):
                     yield Button("Copy Cmd (Session)", variant="success", id="edit-save-copy")
                     yield Button("Update RC (Persistent)", variant="warning", id="edit-save-rc")
+                    if all_shells:
+                        yield Button("Update All Shells", variant="warning", id="edit-save-all-rc")
                     yield Button("Edit in $EDITOR", variant="default", id="edit-external") # New button
                     yield Button("Cancel", variant="error", id="edit-cancel")
             # Container for adding a new variable (initially hidden)
@@ -36,6 +50,8 @@ def compose_app() -> ComposeResult:
                 with Horizontal(id="add-buttons"):
                      yield Button("Copy Cmd (Session)", variant="success", id="add-save-copy")
                      yield Button("Update RC (Persistent)", variant="warning", id="add-save-rc")
+                     if all_shells:
+                         yield Button("Update All Shells", variant="warning", id="add-save-all-rc")
                      yield Button("Launch Term (Session)", variant="primary", id="add-save-launch")
                      yield Button("Cancel", variant="error", id="add-cancel")
             # Container for confirming deletion (initially hidden)
@@ -44,6 +60,17 @@ def compose_app() -> ComposeResult:
                 with Horizontal(id="delete-buttons"):
                     yield Button("Copy Cmd (Session)", variant="success", id="delete-confirm-copy")
                     yield Button("Update RC (Persistent)", variant="warning", id="delete-confirm-rc")
+                    if all_shells:
+                        yield Button("Update All Shells", variant="warning", id="delete-confirm-all-rc")
                     # Removed Launch Term button
                     yield Button("Cancel", variant="error", id="delete-cancel")
+            # Staged RC changes and the diff committing them writes (initially hidden)
+            with Vertical(id="review-changes-container", classes="hidden"):
+                yield Label("Pending RC Changes", id="review-label")
+                with ScrollableContainer(id="review-scroll"):
+                    yield Static("", id="review-diff")
+                with Horizontal(id="review-buttons"):
+                    yield Button("Commit", variant="warning", id="review-commit")
+                    yield Button("Discard", variant="error", id="review-discard")
+                    yield Button("Close", variant="default", id="review-close")
     yield Footer()
@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+from rich.cells import cell_len, set_cell_size
+from rich.segment import Segment
+from rich.text import Text
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import DataTable
+from textual.widgets.data_table import RowKey
+
+# A row as handed over by the app: (name, full value, type, *extra cells such as Shells)
+Row = Tuple[str, ...]
+# Built cells; Name and Value may be rich Text when a search match is highlighted
+Cells = Tuple[Text | str, ...]
+
+
+class VirtualEnvTable(ScrollView, can_focus=True):
+    """
+    A DataTable look-alike for very large environments. It only keeps the list of
+    matching rows (references, no cell content) and builds the cells for the rows in
+    the viewport plus a small overscan when they are drawn. It supports the subset of
+    the DataTable API that EnvTuiApp uses (cursor_row, move_cursor, get_row_index,
+    get_row, row_count) and posts DataTable.RowHighlighted / RowSelected messages, so
+    the app's existing handlers work unchanged.
+    """
+
+    BINDINGS = [
+        Binding("enter", "select_cursor", "Select", show=False),
+        Binding("up", "cursor_up", "Cursor Up", show=False),
+        Binding("down", "cursor_down", "Cursor Down", show=False),
+        Binding("pageup", "page_up", "Page Up", show=False),
+        Binding("pagedown", "page_down", "Page Down", show=False),
+        Binding("home", "scroll_home", "Home", show=False),
+        Binding("end", "scroll_end", "End", show=False),
+    ]
+
+    COMPONENT_CLASSES = {
+        "virtual-table--header",
+        "virtual-table--cursor",
+        "virtual-table--even-row",
+    }
+
+    DEFAULT_CSS = """
+    VirtualEnvTable {
+        background: $surface;
+        height: 100%;
+    }
+    VirtualEnvTable > .virtual-table--header {
+        text-style: bold;
+        background: $panel;
+    }
+    VirtualEnvTable > .virtual-table--cursor {
+        background: $accent;
+    }
+    VirtualEnvTable > .virtual-table--even-row {
+        background: $primary 10%;
+    }
+    """
+
+    OVERSCAN = 20 # Rows built above/below the viewport so small scrolls need no work
+    MAX_NAME_WIDTH = 40
+    MIN_VALUE_WIDTH = 20
+    TYPE_WIDTH = 6
+
+    cursor_row = reactive(0)
+
+    def __init__(self, *, id: str | None = None, classes: str | None = None) -> None:
+        super().__init__(id=id, classes=classes)
+        self._rows: List[Row] = []
+        self._row_index: Dict[str, int] | None = None # Built lazily by get_row_index
+        self._cell_cache: "OrderedDict[int, Cells]" = OrderedDict() # row -> cells
+        # (name, value, width) -> Value cell; the app supplies a cached, width-aware renderer
+        self._format_value: Callable[[str, str, int], Text | str] = lambda name, value, width: value
+        # name -> Name cell (e.g. with the search match highlighted)
+        self._format_name: Callable[[str], Text | str] = lambda name: name
+        self._labels: Tuple[str, ...] = ("Name", "Value", "Type")
+        self._name_width = len("Name")
+        self._extra_widths: Tuple[int, ...] = () # Widths of the columns after Type
+        # Accepted for DataTable compatibility (the app configures these on mount)
+        self.cursor_type = "row"
+        self.zebra_stripes = True
+        self.fixed_columns = 0
+
+    # --- DataTable-compatible API ---
+
+    @property
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    def add_columns(self, *labels: str) -> Tuple[str, ...]:
+        """Sets the header labels: Name, Value and Type, then any extra columns."""
+        self._labels = tuple(labels)
+        self._update_extra_widths()
+        self._update_virtual_size()
+        self.refresh()
+        return self._labels
+
+    def get_row_index(self, row_key: RowKey | str) -> int:
+        """Index of the row for a variable name. Raises KeyError if it is not shown."""
+        if self._row_index is None:
+            self._row_index = {row[0]: index for index, row in enumerate(self._rows)}
+        key = row_key.value if isinstance(row_key, RowKey) else row_key
+        return self._row_index[key]
+
+    def get_row(self, row_key: RowKey | str) -> List[Text | str]:
+        """Cells (name, display value, type, extra cells) of the row for a variable name."""
+        return list(self._cells(self.get_row_index(row_key)))
+
+    def move_cursor(self, *, row: int | None = None, column: int | None = None, animate: bool = False) -> None:
+        """Moves the cursor to row (clamped) and scrolls it into view."""
+        if row is not None and self._rows:
+            self.cursor_row = max(0, min(row, len(self._rows) - 1))
+            self._scroll_cursor_into_view(animate)
+
+    def set_rows(
+        self,
+        rows: List[Row],
+        format_value: Callable[[str, str, int], Text | str],
+        format_name: Callable[[str], Text | str] | None = None,
+    ) -> None:
+        """Replaces the shown rows. Only references are kept; cells are built when drawn."""
+        selected = self._rows[self.cursor_row][0] if 0 <= self.cursor_row < len(self._rows) else None
+        self._rows = rows
+        self._format_value = format_value
+        self._format_name = format_name or (lambda name: name)
+        self._row_index = None
+        self._cell_cache.clear()
+        self._name_width = min(
+            max([len(self._labels[0])] + [cell_len(row[0]) for row in rows]),
+            self.MAX_NAME_WIDTH,
+        )
+        self._update_extra_widths()
+        self._update_virtual_size()
+        # Keep the cursor on the same variable when it is still shown
+        old_row = self.cursor_row
+        try:
+            self.cursor_row = self.get_row_index(selected) if selected is not None else 0
+        except KeyError:
+            self.cursor_row = max(0, min(self.cursor_row, len(rows) - 1))
+        # watch_cursor_row only runs when the index changes; a different variable can now be under it
+        if self.cursor_row == old_row and 0 <= old_row < len(rows) and rows[old_row][0] != selected:
+            self.post_message(DataTable.RowHighlighted(self, old_row, RowKey(rows[old_row][0])))
+        self.refresh()
+
+    # --- Rendering ---
+
+    def _update_extra_widths(self) -> None:
+        """Sizes each column after Type to its label and its widest cell."""
+        self._extra_widths = tuple(
+            min(max([cell_len(label)] + [cell_len(row[column]) for row in self._rows]), self.MAX_NAME_WIDTH)
+            for column, label in enumerate(self._labels[3:], start=3)
+        )
+
+    @property
+    def _fixed_width(self) -> int:
+        """Width of everything but the Value column: the other cells plus their padding."""
+        return self._name_width + self.TYPE_WIDTH + sum(self._extra_widths) + 6 + 2 * len(self._extra_widths)
+
+    @property
+    def _value_width(self) -> int:
+        """Value column width: whatever the other columns leave of the widget."""
+        return max(self.MIN_VALUE_WIDTH, self.size.width - self._fixed_width)
+
+    def _update_virtual_size(self) -> None:
+        self.virtual_size = Size(self._fixed_width + self._value_width, len(self._rows) + 1)
+
+    def on_resize(self, event: events.Resize) -> None:
+        # Cells depend on the Value column width, so rebuild them for the new size
+        self._cell_cache.clear()
+        self._update_virtual_size()
+        self.refresh()
+
+    def _cells(self, index: int) -> Cells:
+        """Cells for one row, from the cache or built (with its overscan window) on demand."""
+        cells = self._cell_cache.get(index)
+        if cells is None:
+            first = max(0, index - self.OVERSCAN)
+            last = min(len(self._rows), index + self.size.height + self.OVERSCAN)
+            for row_index in range(first, last):
+                if row_index in self._cell_cache:
+                    self._cell_cache.move_to_end(row_index) # Still in view; evict others first
+                else:
+                    name, value, *rest = self._rows[row_index]
+                    self._cell_cache[row_index] = (
+                        self._format_name(name), self._format_value(name, value, self._value_width), *rest
+                    )
+            # Drop rows far outside the viewport so memory stays bounded
+            limit = 2 * (self.size.height + 2 * self.OVERSCAN)
+            while len(self._cell_cache) > limit:
+                self._cell_cache.popitem(last=False)
+            cells = self._cell_cache[index]
+        return cells
+
+    def _format_line(self, cells: Tuple[Text | str, ...]) -> str | Text:
+        name, value, *rest = cells
+        # Type and any extra columns are plain text
+        tail = "  ".join(
+            set_cell_size(cell, width) for cell, width in zip(rest, (self.TYPE_WIDTH,) + self._extra_widths)
+        ) + " "
+        if isinstance(name, str) and isinstance(value, str):
+            return f" {set_cell_size(name, self._name_width)}  {set_cell_size(value, self._value_width)}  {tail}"
+        # A highlighted match: pad/crop the styled cells the same way, keeping their spans
+        line = Text(" ")
+        for cell, width in ((name, self._name_width), (value, self._value_width)):
+            cell = cell.copy() if isinstance(cell, Text) else Text(cell)
+            cell.truncate(width, overflow="crop", pad=True)
+            line.append_text(cell)
+            line.append("  ")
+        line.append(tail)
+        return line
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        if y == 0: # Header stays at the top of the viewport
+            style = self.get_component_rich_style("virtual-table--header")
+            text = self._format_line(self._labels)
+        else:
+            index = scroll_y + y - 1
+            if index >= len(self._rows):
+                return Strip.blank(width, self.rich_style)
+            text = self._format_line(self._cells(index))
+            if index == self.cursor_row:
+                style = self.get_component_rich_style("virtual-table--cursor")
+            elif self.zebra_stripes and index % 2 == 0:
+                style = self.get_component_rich_style("virtual-table--even-row")
+            else:
+                style = self.rich_style
+        if isinstance(text, Text):
+            segments = list(Segment.apply_style(text.render(self.app.console), style))
+            strip = Strip(segments, text.cell_len)
+        else:
+            strip = Strip([Segment(text, style)], cell_len(text))
+        return strip.crop(scroll_x, scroll_x + width).extend_cell_length(width, style)
+
+    # --- Cursor Handling ---
+
+    def _scroll_cursor_into_view(self, animate: bool = False) -> None:
+        visible_rows = max(1, self.size.height - 1) # Minus the header line
+        top = self.scroll_offset.y
+        if self.cursor_row < top:
+            self.scroll_to(y=self.cursor_row, animate=animate)
+        elif self.cursor_row >= top + visible_rows:
+            self.scroll_to(y=self.cursor_row - visible_rows + 1, animate=animate)
+
+    def watch_cursor_row(self, old_row: int, new_row: int) -> None:
+        self.refresh()
+        if 0 <= new_row < len(self._rows):
+            self.post_message(DataTable.RowHighlighted(self, new_row, RowKey(self._rows[new_row][0])))
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(row=self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(row=self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(row=self.cursor_row - max(1, self.size.height - 1))
+
+    def action_page_down(self) -> None:
+        self.move_cursor(row=self.cursor_row + max(1, self.size.height - 1))
+
+    def action_scroll_home(self) -> None:
+        self.move_cursor(row=0)
+
+    def action_scroll_end(self) -> None:
+        self.move_cursor(row=len(self._rows) - 1)
+
+    def action_select_cursor(self) -> None:
+        if 0 <= self.cursor_row < len(self._rows):
+            self.post_message(DataTable.RowSelected(self, self.cursor_row, RowKey(self._rows[self.cursor_row][0])))
+
+    def on_click(self, event: events.Click) -> None:
+        index = self.scroll_offset.y + event.y - 1
+        if event.y >= 1 and 0 <= index < len(self._rows):
+            self.move_cursor(row=index)
+            self.action_select_cursor()